@@ -1,14 +1,39 @@
 # main.py
+import orjson
 import uvicorn
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse, FileResponse
+from starlette.responses import JSONResponse, FileResponse, Response
 from starlette.routing import Route
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
 from uuid import uuid4
-from datetime import datetime
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import asyncio
+import hashlib
+import itertools
+import os
+import time
+
+# --- Time ---
+_now_cache = [0, ""]  # [epoch second, ISO string]
+# Bound once so the per-call path skips the module/attribute lookups
+_time = time.time
+_fromtimestamp = datetime.fromtimestamp
+_UTC = timezone.utc
+
+def _now_iso():
+    # Timestamps only carry second precision, so format once per second
+    now = int(_time())
+    if now != _now_cache[0]:
+        _now_cache[1] = _fromtimestamp(now, _UTC).isoformat()
+        _now_cache[0] = now
+    return _now_cache[1]
+
+NOW_ISO = _now_iso()
 
-# --- Fake in-memory storage ---
 # --- Fake in-memory storage ---
 RESOURCES = [
     {
@@ -25,7 +50,7 @@ RESOURCES = [
         "downloads": 12,
         "rating": 4.5,
         "tags": ["Exam Prep", "Important"],
-        "upload_date": datetime.utcnow().isoformat(),
+        "upload_date": NOW_ISO,
         "is_featured": True,
         "is_trending": True
     },
@@ -43,7 +68,7 @@ RESOURCES = [
         "downloads": 8,
         "rating": 4.2,
         "tags": ["Semester 1", "Important"],
-        "upload_date": datetime.utcnow().isoformat(),
+        "upload_date": NOW_ISO,
         "is_featured": False,
         "is_trending": True
     },
@@ -61,7 +86,7 @@ RESOURCES = [
         "downloads": 15,
         "rating": 4.8,
         "tags": ["Exam Prep"],
-        "upload_date": datetime.utcnow().isoformat(),
+        "upload_date": NOW_ISO,
         "is_featured": True,
         "is_trending": False
     },
@@ -79,7 +104,7 @@ RESOURCES = [
         "downloads": 20,
         "rating": 4.7,
         "tags": ["Important", "Exam Prep"],
-        "upload_date": datetime.utcnow().isoformat(),
+        "upload_date": NOW_ISO,
         "is_featured": False,
         "is_trending": True
     }
@@ -87,7 +112,7 @@ RESOURCES = [
 
 COMMENTS = {}
 USERS = {}
-FAVORITES = {}
+FAVORITES = {}  # user id -> set of resource ids
 STATS = {
     "total_resources": len(RESOURCES),
     "total_users": 1,
@@ -98,76 +123,304 @@ SUBJECTS = ["Math", "Physics", "Computer Science"]
 TAGS = ["Exam Prep", "Important", "Semester 1"]
 UNIVERSITIES = ["MIT", "Stanford", "IIT Delhi"]
 
+# --- Indexes (kept in sync with RESOURCES on upload/delete) ---
+# cache key -> (encoded body, ETag); cleared on every mutation. Keys include
+# the client's offset/limit, so it is an LRU capped at _RESOURCES_CACHE_MAX
+_RESOURCES_CACHE = OrderedDict()
+_RESOURCES_CACHE_MAX = 256
+RESOURCES_BY_ID = {}
+TRENDING = []
+FEATURED = []
+# id -> lowercased title, and trigram -> {id: None} posting lists (dicts keep
+# insertion order, so results come back in upload order)
+TITLES_LOWER = {}
+TRIGRAM_INDEX = {}
+# (lowercased title, title) pairs kept sorted for prefix suggestions
+TITLES_SORTED = []
+
+
+def _resources_changed():
+    _RESOURCES_CACHE.clear()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _index_resource(resource):
+    resource_id = resource["id"]
+    RESOURCES_BY_ID[resource_id] = resource
+    title = (resource["title"] or "").lower()
+    TITLES_LOWER[resource_id] = title
+    for gram in _trigrams(title):
+        TRIGRAM_INDEX.setdefault(gram, {})[resource_id] = None
+    insort(TITLES_SORTED, (title, resource["title"] or ""))
+    if resource["is_trending"]:
+        TRENDING.append(resource)
+    if resource["is_featured"]:
+        FEATURED.append(resource)
+    _resources_changed()
+
+
+def _unindex_resource(resource):
+    resource_id = resource["id"]
+    del RESOURCES_BY_ID[resource_id]
+    title = TITLES_LOWER.pop(resource_id)
+    for gram in _trigrams(title):
+        posting = TRIGRAM_INDEX[gram]
+        del posting[resource_id]
+        if not posting:
+            del TRIGRAM_INDEX[gram]
+    del TITLES_SORTED[bisect_left(TITLES_SORTED, (title, resource["title"] or ""))]
+    if resource["is_trending"]:
+        TRENDING.remove(resource)
+    if resource["is_featured"]:
+        FEATURED.remove(resource)
+    _resources_changed()
+
+
+def _set_flag(resource, key, value):
+    # key is "is_trending" or "is_featured"
+    if resource[key] == value:
+        return
+    target = TRENDING if key == "is_trending" else FEATURED
+    resource[key] = value
+    if value:
+        target.append(resource)
+    else:
+        target.remove(resource)
+    _resources_changed()
+
+
+for _resource in RESOURCES:
+    _index_resource(_resource)
+
 
 # --- Helper ---
-def api_response(data, message="OK", status="success", pagination=None):
-    return JSONResponse({
+def _envelope(data, message="OK", status="success", pagination=None):
+    return {
         "data": data,
         "message": message,
         "status": status,
         "pagination": pagination
-    })
+    }
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content):
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def api_response(data, message="OK", status="success", pagination=None):
+    return ORJSONResponse(_envelope(data, message, status, pagination))
+
+def _cached_json(data, message="OK", status="success", pagination=None):
+    # Encoded the same way ORJSONResponse.render does, so cached and uncached
+    # endpoints produce identical bodies
+    return orjson.dumps(
+        _envelope(data, message, status, pagination),
+        option=orjson.OPT_NON_STR_KEYS,
+    )
+
+def _bytes_response(body):
+    return Response(body, media_type="application/json")
+
+# --- Cached bodies for near-static endpoints ---
+SUBJECTS_BODY = _cached_json(SUBJECTS)
+TAGS_BODY = _cached_json(TAGS)
+UNIVERSITIES_BODY = _cached_json(UNIVERSITIES)
+# Rebuilt lazily by get_stats after any STATS mutation
+_STATS_BODY = None
+
+def _stats_changed():
+    global _STATS_BODY
+    _STATS_BODY = None
+
+# Downloads are counted with itertools.count, whose next() is atomic, and
+# folded into STATS only when stats are read. Each read also consumes one
+# tick of _download_hits, which _download_reads cancels out.
+_seed_downloads = STATS["total_downloads"]
+_download_hits = itertools.count()
+_download_reads = itertools.count()
+
+def _sync_download_stats():
+    total = _seed_downloads + next(_download_hits) - next(_download_reads)
+    if total != STATS["total_downloads"]:
+        STATS["total_downloads"] = total
+        _stats_changed()
+
+def _int_param(request, name, default):
+    try:
+        return max(int(request.query_params[name]), 0)
+    except (KeyError, ValueError):
+        return default
+
+def _etag_response(request, key, build):
+    # The body is built on first use and cached with an ETag hashed from its
+    # bytes, so the tag survives restarts and agrees across workers; 304 if
+    # the client already has it
+    entry = _RESOURCES_CACHE.get(key)
+    if entry is None:
+        body = build()
+        etag = f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        entry = _RESOURCES_CACHE[key] = (body, etag)
+        if len(_RESOURCES_CACHE) > _RESOURCES_CACHE_MAX:
+            _RESOURCES_CACHE.popitem(last=False)
+    else:
+        _RESOURCES_CACHE.move_to_end(key)
+    body, etag = entry
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response = _bytes_response(body)
+    response.headers["ETag"] = etag
+    return response
+
+def _paginated_resources(request):
+    offset = _int_param(request, "offset", 0)
+    limit = _int_param(request, "limit", None)
+    end = None if limit is None else offset + limit
+    return _etag_response(
+        request,
+        ("list", offset, limit),
+        lambda: _cached_json(RESOURCES[offset:end], pagination={
+            "offset": offset,
+            "limit": limit,
+            "total": len(RESOURCES)
+        })
+    )
+
+PLACEHOLDER_PATH = "placeholder.pdf"
+_placeholder_stat = None
+
+def _placeholder_response():
+    # The placeholder never changes, so stat it once instead of per download
+    global _placeholder_stat
+    if _placeholder_stat is None:
+        _placeholder_stat = os.stat(PLACEHOLDER_PATH)
+    return FileResponse(
+        PLACEHOLDER_PATH,
+        filename="resource.pdf",
+        stat_result=_placeholder_stat
+    )
 
 # --- API Handlers ---
 async def get_resources(request: Request):
-    params = dict(request.query_params)
     # You could add filtering logic here
-    return api_response(RESOURCES)
+    return _paginated_resources(request)
 
 async def get_resource(request: Request):
     resource_id = request.path_params["id"]
-    resource = next((r for r in RESOURCES if r["id"] == resource_id), None)
+    resource = RESOURCES_BY_ID.get(resource_id)
     if not resource:
         return api_response(None, "Resource not found", "error")
-    return api_response(resource)
+    return _etag_response(
+        request,
+        ("detail", resource_id),
+        lambda: _cached_json(resource)
+    )
+
+# Bounds on multipart parsing so a single upload can't tie up the loop
+UPLOAD_MAX_FILES = 5
+UPLOAD_MAX_FIELDS = 32
 
 async def upload_resource(request: Request):
-    form = await request.form()
-    # Normally you’d save files to storage here
-    new_resource = {
-        "id": str(uuid4()),
-        "title": form.get("title"),
-        "description": form.get("description"),
-        "type": form.get("type"),
-        "subject": form.get("subject"),
-        "semester": form.get("semester"),
-        "course_code": form.get("course_code"),
-        "author": form.get("author"),
-        "file_url": "https://files.example.com/" + form.get("title", "").replace(" ", "_"),
-        "thumbnail_url": None,
-        "downloads": 0,
-        "rating": 0,
-        "tags": form.getlist("tags"),
-        "upload_date": datetime.utcnow().isoformat(),
-        "is_featured": False,
-        "is_trending": False
-    }
+    # The context manager closes any spooled upload files once we're done
+    async with request.form(
+        max_files=UPLOAD_MAX_FILES, max_fields=UPLOAD_MAX_FIELDS
+    ) as form:
+        # Normally you’d save files to storage here
+        new_resource = {
+            "id": str(uuid4()),
+            "title": form.get("title"),
+            "description": form.get("description"),
+            "type": form.get("type"),
+            "subject": form.get("subject"),
+            "semester": form.get("semester"),
+            "course_code": form.get("course_code"),
+            "author": form.get("author"),
+            "file_url": "https://files.example.com/" + form.get("title", "").replace(" ", "_"),
+            "thumbnail_url": None,
+            "downloads": 0,
+            "rating": 0,
+            "tags": form.getlist("tags"),
+            "upload_date": _now_iso(),
+            "is_featured": False,
+            "is_trending": False
+        }
     RESOURCES.append(new_resource)
+    _index_resource(new_resource)
     STATS["total_resources"] += 1
+    _stats_changed()
     return api_response(new_resource, "Resource uploaded")
 
 async def delete_resource(request: Request):
     resource_id = request.path_params["id"]
-    global RESOURCES
-    RESOURCES = [r for r in RESOURCES if r["id"] != resource_id]
+    resource = RESOURCES_BY_ID.get(resource_id)
+    if resource is None:
+        return api_response(None, "Resource not found", "error")
+    # Removed in place so RESOURCES keeps its identity; a swap-with-last
+    # delete would be O(1) but would reorder paginated listings
+    RESOURCES.remove(resource)
+    _unindex_resource(resource)
+    STATS["total_resources"] -= 1
+    _stats_changed()
     return api_response(None, "Resource deleted")
 
 async def download_resource(request: Request):
     resource_id = request.path_params["id"]
-    STATS["total_downloads"] += 1
+    if resource_id not in RESOURCES_BY_ID:
+        return api_response(None, "Resource not found", "error")
+    next(_download_hits)
     # Just returning a placeholder file
-    return FileResponse("placeholder.pdf", filename="resource.pdf")
+    return _placeholder_response()
 
 # --- Search ---
+# Above this many resources, searches run in the default executor so a long
+# scan can't stall the event loop; below it the thread hand-off costs more
+# than the scan itself
+SEARCH_OFFLOAD_THRESHOLD = 2000
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "32"))
+
+def _search_sync(q):
+    # q must already be lowercased. May run off the loop thread while
+    # uploads/deletes mutate the indexes, so postings are copied before
+    # iterating and lookups tolerate ids that have just been removed.
+    if len(q) < 3:
+        return [r for r in RESOURCES if q in TITLES_LOWER.get(r["id"], "")]
+    postings = []
+    for gram in _trigrams(q):
+        posting = TRIGRAM_INDEX.get(gram)
+        if not posting:
+            return []
+        postings.append(posting)
+    postings.sort(key=len)
+    smallest, rest = list(postings[0]), postings[1:]
+    results = []
+    for rid in smallest:
+        if all(rid in p for p in rest) and q in TITLES_LOWER.get(rid, ""):
+            resource = RESOURCES_BY_ID.get(rid)
+            if resource is not None:
+                results.append(resource)
+    return results
+
+async def _search(q):
+    if len(RESOURCES) > SEARCH_OFFLOAD_THRESHOLD:
+        return await asyncio.to_thread(_search_sync, q)
+    return _search_sync(q)
+
 async def search_resources(request: Request):
     q = request.query_params.get("q", "").lower()
-    results = [r for r in RESOURCES if q in r["title"].lower()]
-    return api_response(results)
+    return api_response(await _search(q))
 
 async def search_suggestions(request: Request):
     q = request.query_params.get("q", "").lower()
-    suggestions = list({r["title"] for r in RESOURCES if q in r["title"].lower()})
-    return api_response(suggestions)
+    # Every title containing q, ranked: prefix matches (straight off the
+    # sorted titles) first, then the remaining substring matches
+    lo = bisect_left(TITLES_SORTED, (q,))
+    hi = bisect_left(TITLES_SORTED, (q + "\uffff",))
+    titles = itertools.chain(
+        (title for _, title in TITLES_SORTED[lo:hi]),
+        (r["title"] for r in await _search(q)),
+    )
+    return api_response(list(dict.fromkeys(titles)))
 
 # --- Comments ---
 async def get_comments(request: Request):
@@ -183,7 +436,7 @@ async def add_comment(request: Request):
         "user": {"id": "user1", "name": "Test User"},
         "content": data.get("content"),
         "rating": data.get("rating"),
-        "created_at": datetime.utcnow().isoformat(),
+        "created_at": _now_iso(),
         "replies": []
     }
     COMMENTS.setdefault(resource_id, []).append(comment)
@@ -199,7 +452,7 @@ async def get_user_profile(request: Request):
         "semester": "5",
         "uploads_count": 0,
         "downloads_count": 0,
-        "joined_date": datetime.utcnow().isoformat()
+        "joined_date": _now_iso()
     }))
 
 async def update_user_profile(request: Request):
@@ -208,80 +461,168 @@ async def update_user_profile(request: Request):
     return api_response(USERS["user1"], "Profile updated")
 
 async def get_user_uploads(request: Request):
-    return api_response(RESOURCES)
+    return _paginated_resources(request)
 
 async def get_user_favorites(request: Request):
-    return api_response(FAVORITES.get("user1", []))
+    return api_response(list(FAVORITES.get("user1", ())))
 
 async def toggle_favorite(request: Request):
     resource_id = request.path_params["id"]
-    favs = FAVORITES.setdefault("user1", [])
+    favs = FAVORITES.setdefault("user1", set())
     if resource_id in favs:
-        favs.remove(resource_id)
+        favs.discard(resource_id)
     else:
-        favs.append(resource_id)
+        favs.add(resource_id)
     return api_response(None, "Favorite toggled")
 
 # --- Analytics ---
 async def get_stats(request: Request):
-    return api_response(STATS)
+    global _STATS_BODY
+    _sync_download_stats()
+    if _STATS_BODY is None:
+        _STATS_BODY = _cached_json(STATS)
+    return _bytes_response(_STATS_BODY)
 
 async def get_trending(request: Request):
-    trending = [r for r in RESOURCES if r["is_trending"]]
-    return api_response(trending)
+    return _etag_response(
+        request,
+        "trending",
+        lambda: _cached_json(TRENDING)
+    )
 
 async def get_featured(request: Request):
-    featured = [r for r in RESOURCES if r["is_featured"]]
-    return api_response(featured)
+    return _etag_response(
+        request,
+        "featured",
+        lambda: _cached_json(FEATURED)
+    )
 
 # --- Categories ---
 async def get_subjects(request: Request):
-    return api_response(SUBJECTS)
+    return _bytes_response(SUBJECTS_BODY)
 
 async def get_tags(request: Request):
-    return api_response(TAGS)
+    return _bytes_response(TAGS_BODY)
 
 # --- University ---
 async def get_universities(request: Request):
-    return api_response(UNIVERSITIES)
+    return _bytes_response(UNIVERSITIES_BODY)
 
 # --- Routes ---
-routes = [
-    Route("/api/resources", get_resources, methods=["GET"]),
-    Route("/api/resources/{id}", get_resource, methods=["GET"]),
-    Route("/api/resources", upload_resource, methods=["POST"]),
-    Route("/api/resources/{id}", delete_resource, methods=["DELETE"]),
-    Route("/api/resources/{id}/download", download_resource, methods=["GET"]),
-
-    Route("/api/search", search_resources, methods=["GET"]),
-    Route("/api/search/suggestions", search_suggestions, methods=["GET"]),
+def _route(path, **handlers):
+    # One Route per path that branches on method, instead of one Route per
+    # method that the router has to scan past
+    if "GET" in handlers:
+        handlers.setdefault("HEAD", handlers["GET"])
 
-    Route("/api/resources/{id}/comments", get_comments, methods=["GET"]),
-    Route("/api/resources/{id}/comments", add_comment, methods=["POST"]),
+    async def endpoint(request: Request):
+        return await handlers[request.method](request)
 
-    Route("/api/user/profile", get_user_profile, methods=["GET"]),
-    Route("/api/user/profile", update_user_profile, methods=["PUT"]),
-    Route("/api/user/uploads", get_user_uploads, methods=["GET"]),
-    Route("/api/user/favorites", get_user_favorites, methods=["GET"]),
-    Route("/api/user/favorites/{id}", toggle_favorite, methods=["POST"]),
+    # named after the GET handler (else the first), as a plain Route would be,
+    # rather than all sharing the closure's name
+    primary = handlers.get("GET") or next(iter(handlers.values()))
+    return Route(path, endpoint, methods=list(handlers), name=primary.__name__)
 
-    Route("/api/stats", get_stats, methods=["GET"]),
+# Static, high-traffic paths first; parametric paths last
+routes = [
+    _route("/api/resources", GET=get_resources, POST=upload_resource),
+    Route("/api/search", search_resources, methods=["GET"]),
     Route("/api/trending", get_trending, methods=["GET"]),
     Route("/api/featured", get_featured, methods=["GET"]),
+    Route("/api/search/suggestions", search_suggestions, methods=["GET"]),
+    Route("/api/stats", get_stats, methods=["GET"]),
 
     Route("/api/subjects", get_subjects, methods=["GET"]),
     Route("/api/tags", get_tags, methods=["GET"]),
-    Route("/api/universities", get_universities, methods=["GET"])
+    Route("/api/universities", get_universities, methods=["GET"]),
+
+    _route("/api/user/profile", GET=get_user_profile, PUT=update_user_profile),
+    Route("/api/user/uploads", get_user_uploads, methods=["GET"]),
+    Route("/api/user/favorites", get_user_favorites, methods=["GET"]),
+
+    _route("/api/resources/{id}", GET=get_resource, DELETE=delete_resource),
+    Route("/api/resources/{id}/download", download_resource, methods=["GET"]),
+    _route("/api/resources/{id}/comments", GET=get_comments, POST=add_comment),
+    Route("/api/user/favorites/{id}", toggle_favorite, methods=["POST"])
 ]
 
+# --- Middleware ---
+class PreflightMiddleware:
+    # Answers CORS preflights with headers built once, matching what
+    # CORSMiddleware sends for the allow-all config below. Every other
+    # request falls through to CORSMiddleware untouched.
+    PREFLIGHT_HEADERS = [
+        (b"access-control-allow-origin", b"*"),
+        (b"access-control-allow-methods", b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"),
+        (b"access-control-max-age", b"600"),
+    ]
+    # CORSMiddleware answers with PlainTextResponse("OK", status_code=200)
+    BODY = b"OK"
+    BODY_HEADERS = [
+        (b"content-length", b"2"),
+        (b"content-type", b"text/plain; charset=utf-8"),
+    ]
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "OPTIONS":
+            origin = method = requested = None
+            for name, value in scope["headers"]:
+                if name == b"origin":
+                    origin = value
+                elif name == b"access-control-request-method":
+                    method = value
+                elif name == b"access-control-request-headers":
+                    requested = value
+            if origin is not None and method is not None:
+                headers = self.PREFLIGHT_HEADERS
+                if requested is not None:
+                    headers = headers + [(b"access-control-allow-headers", requested)]
+                await send({"type": "http.response.start", "status": 200, "headers": headers + self.BODY_HEADERS})
+                await send({"type": "http.response.body", "body": self.BODY})
+                return
+        await self.app(scope, receive, send)
+
 # --- App ---
-app = Starlette(routes=routes)
+_executor = None
+
+def _configure_executor():
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=THREAD_POOL_SIZE)
+    asyncio.get_running_loop().set_default_executor(_executor)
+
+def _shutdown_executor():
+    # Stop accepting work and let idle threads exit; don't block shutdown
+    # on searches still running
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+app = Starlette(
+    routes=routes,
+    on_startup=[_configure_executor],
+    on_shutdown=[_shutdown_executor],
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"]
 )
+# Added last so it runs first
+app.add_middleware(PreflightMiddleware)
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Storage is in-process, so each extra worker gets its own copy of the
+    # data; keep WEB_CONCURRENCY at 1 unless that is acceptable
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
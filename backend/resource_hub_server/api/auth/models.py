@@ -1,19 +1,23 @@
 from transutil import syncbit
 from typing import Optional, Any
 
+# Shared by Name and UserRegistrationModel
+FIRST_NAME_EXTRAS = {"description": "The first name of the user."}
+LAST_NAME_EXTRAS = {"description": "The last name of the user."}
+
 class Name(syncbit.Schema):
     """
     Schema for names used in the authentication system.
     """
-    firstName: str = syncbit.fields.String(required=True, extras = {"description": "The first name of the user."})
-    lastName: str = syncbit.fields.String(required=True, extras = {"description": "The last name of the user."})
+    firstName: str = syncbit.fields.String(required=True, extras = FIRST_NAME_EXTRAS)
+    lastName: str = syncbit.fields.String(required=True, extras = LAST_NAME_EXTRAS)
 
 class UserRegistrationModel(syncbit.Schema):
     """
     Schema for user details in the authentication system.
     """
-    firstName: str = syncbit.fields.String(required=True, extras = {"description": "The first name of the user."})
-    lastName: str = syncbit.fields.String(required=True, extras = {"description": "The last name of the user."})
+    firstName: str = syncbit.fields.String(required=True, extras = FIRST_NAME_EXTRAS)
+    lastName: str = syncbit.fields.String(required=True, extras = LAST_NAME_EXTRAS)
     studentId: str = syncbit.fields.String(required=True, extras = {"description": "The unique student ID of the user."})
     email: str = syncbit.fields.String(required=True, extras = {"description": "The email address of the user."})
     dob: str = syncbit.fields.String(required=True, extras = {"description": "The date of birth of the user."})
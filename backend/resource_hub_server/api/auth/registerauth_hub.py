@@ -12,20 +12,21 @@ from __future__ import annotations
 
 import os
 import re
+import time
 import uuid
 import secrets
 import logging
 import asyncio
+import threading
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from pathlib import Path
-from datetime import datetime, timedelta
-
-import aiofiles
+from datetime import datetime, timedelta, timezone
 
 # optional libs (used if available)
 try:
     from PIL import Image
+    _LANCZOS = getattr(Image, "Resampling", Image).LANCZOS
 except Exception:
     Image = None
 
@@ -34,11 +35,6 @@ try:
 except Exception:
     magiclib = None
 
-try:
-    import numpy as np
-except Exception:
-    np = None
-
 from aquilify.wrappers import Request
 from aquilify.core.backend.sessions.localsessions import SessionManager
 from aquilify.security import crypter
@@ -48,7 +44,10 @@ from aquilify import responses
 
 from .models import UserRegistrationModel
 from .. import exception, connection
-from .utils import mailer, mask
+from .utils import background, mask
+from .utils.jsonresponse import JsonResponse
+
+__all__ = ["RegisterAuthHub", "RegisterAuthHubView"]
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -68,12 +67,26 @@ class Config:
     OTP_MAX_PER_SESSION: int = 5
     MAIL_RETRY_ATTEMPTS: int = 3
     MAIL_RETRY_DELAY_SECONDS: float = 0.5
-    CHUNK_SIZE: int = 64 * 1024  # 64KB
+    CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # 1MiB
+    WRITE_BATCH_CHUNKS: int = 8  # chunks per worker-thread write
+    SNIFF_SIZE: int = 2048  # head bytes read up front for MIME sniffing
+    PASSWORD_HASH_METHOD: str = os.getenv("PASSWORD_HASH_METHOD", "scrypt")
+    PASSWORD_SALT_LENGTH: int = 16
 
 
 cfg = Config()
 cfg.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+# python-magic loads its rule database when a Magic handle is built, so build
+# one at import and share it. libmagic handles aren't thread-safe, hence the lock.
+_MAGIC = None
+_MAGIC_LOCK = threading.Lock()
+if magiclib is not None:
+    try:
+        _MAGIC = magiclib.Magic(mime=True)
+    except Exception:
+        logger.exception("python-magic initialisation failed")
+
 
 # ---------------------------
 # Utility helpers
@@ -87,77 +100,155 @@ def _is_valid_extension(ext: str, allowed: Set[str]) -> bool:
     return bool(ext) and ext.lstrip(".") in allowed
 
 
+_UNSAFE_NAME_RE = re.compile(r"[^\w.\-\s]")
+
+
 def _safe_original_name(filename: str) -> str:
     # keep letters, digits, dots, hyphens and underscores; replace others with underscore
-    return re.sub(r"[^\w\.\-\s]", "_", filename).strip().replace(" ", "_")
+    return _UNSAFE_NAME_RE.sub("_", filename).strip().replace(" ", "_")
 
 
-def _generate_uuid_filename(ext: str) -> str:
+def _generate_uuid_filename(ext: str, file_id: Optional[str] = None) -> str:
     if not ext:
         ext = ".jpg"
-    return f"{uuid.uuid4()}{ext}"
+    return f"{file_id or uuid.uuid4()}{ext}"
+
+
+def _new_ids() -> Tuple[str, str]:
+    """(user_id, file_id) from a single getrandom() draw.
+
+    user_id is a UUIDv7 (48-bit ms timestamp + random) so new users land on
+    the hot end of the id index instead of a random page; file_id is a
+    plain v4, since filenames gain nothing from ordering.
+    """
+    rnd = secrets.token_bytes(26)
+    v7 = ((time.time_ns() // 1_000_000) & 0xFFFF_FFFF_FFFF) << 80 | int.from_bytes(rnd[:10], "big")
+    v7 = (v7 & ~(0xF << 76) | (0x7 << 76)) & ~(0x3 << 62) | (0x2 << 62)
+    return str(uuid.UUID(int=v7)), str(uuid.UUID(bytes=rnd[10:], version=4))
+
+
+def _write_chunks(fd: int, chunks: List[bytes]) -> None:
+    # one vectored write per batch where available; writev may write
+    # partially, so finish any remainder with plain writes
+    if hasattr(os, "writev"):
+        written = os.writev(fd, chunks)
+        if written == sum(len(c) for c in chunks):
+            return
+        remainder = memoryview(b"".join(chunks))[written:]
+    else:
+        remainder = memoryview(b"".join(chunks))
+    while remainder:
+        remainder = remainder[os.write(fd, remainder):]
+
+
+def _preallocate(fd: int, size: int) -> bool:
+    # reserve the file's extents in one go instead of growing it per write
+    # (Linux/posix_fallocate only; unsupported filesystems just skip it)
+    try:
+        os.posix_fallocate(fd, 0, size)
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+def _copy_into_fd(source: Any, fd: int, buf_size: int, max_size: int, head: bytes = b"") -> int:
+    # write `head`, then readinto a single reusable buffer and write straight
+    # from a memoryview of it, so no per-chunk bytes objects are allocated.
+    # Stops once max_size is exceeded and returns the byte count seen so far.
+    pending = memoryview(head)
+    while pending:
+        pending = pending[os.write(fd, pending):]
+    buf = bytearray(buf_size)
+    view = memoryview(buf)
+    total = len(head)
+    while True:
+        n = source.readinto(buf)
+        if not n:
+            return total
+        total += n
+        if total > max_size:
+            return total
+        pending = view[:n]
+        while pending:
+            pending = pending[os.write(fd, pending):]
 
 
 def _generate_otp() -> str:
-    # Prefer numpy if available, else secrets
-    if np is not None:
-        try:
-            val = int(np.random.randint(100000, 1000000))
-            return f"{val:06d}"
-        except Exception: 
-            pass
+    # 6-digit numeric, cryptographically strong
     return f"{secrets.randbelow(900000) + 100000:06d}"
 
 
-async def _send_email_with_retries(subject: str, message: str, recipient: str, context: Dict[str, Any], attempts: int = cfg.MAIL_RETRY_ATTEMPTS) -> bool:
-    # mailer.send_email might be blocking; run in thread and retry
-    last_exc: Optional[Exception] = None
-    for attempt in range(1, attempts + 1):
-        try:
-            # run blocking mailer in a thread so we don't block event loop
-            result = await asyncio.to_thread(mailer.send_email, subject, message, recipient, context, "email_templates/email_verification.html")
-            if result:
-                return True
-            last_exc = Exception("mailer.send_email returned falsy")
-        except Exception as exc:
-            last_exc = exc
-            logger.warning("Mailer attempt %d failed: %s", attempt, exc)
-            await asyncio.sleep(cfg.MAIL_RETRY_DELAY_SECONDS * attempt)
-    logger.exception("All mail attempts failed: %s", last_exc)
-    return False
-
-
-async def _maybe_normalize_image(temp_path: Path, max_dim: int) -> None:
-    """Resize/normalize image if Pillow available. Overwrites file in-place."""
-    if Image is None:
-        return
+def _normalize_image_sync(temp_path: Path, max_dim: int) -> Optional[int]:
+    """Returns the rewritten file's size, or None if the file wasn't rewritten."""
     try:
         with Image.open(temp_path) as im:
+            # preserve original format if safe (convert() drops im.format)
+            format = im.format if im.format else "JPEG"
+            if format == "JPEG":
+                # let libjpeg decode at a reduced scale instead of full size
+                im.draft("RGB", (max_dim, max_dim))
             # convert to RGB for consistent formats (PNG/GIF/webp handled gracefully)
             if im.mode not in ("RGB", "RGBA"):
                 im = im.convert("RGB")
-            w, h = im.size
-            if max(w, h) > max_dim:
-                # preserve aspect ratio
-                scale = max_dim / max(w, h)
-                new_size = (int(w * scale), int(h * scale))
-                im = im.resize(new_size, Image.LANCZOS)
-            # overwrite (choose PNG for transparency or JPEG otherwise)
-            # preserve original format if safe
-            format = im.format if im.format else "JPEG"
-            # Save with reasonable quality
-            im.save(temp_path, format=format, quality=85, optimize=True)
+            if max(im.size) > max_dim:
+                # preserves aspect ratio; reducing_gap does a cheap box
+                # reduce before the Lanczos pass so fewer pixels are filtered
+                im.thumbnail((max_dim, max_dim), _LANCZOS, reducing_gap=3.0)
+            # pixels must be in memory before the source file is truncated
+            im.load()
+            # Save with reasonable quality; the handle's position afterwards
+            # is the new size, so the caller needn't stat the file again
+            with open(temp_path, "wb") as out:
+                im.save(out, format=format, quality=85, optimize=True)
+                return out.tell()
     except Exception:
         logger.exception("Image normalization failed for %s", temp_path)
         # don't fail upload for normalization issues
+        return None
+
+
+async def _maybe_normalize_image(temp_path: Path, max_dim: int) -> Optional[int]:
+    """Resize/normalize image if Pillow available. Overwrites file in-place
+    and returns its new size (None when Pillow is missing or it failed)."""
+    if Image is None:
+        return None
+    # decode/resample/encode is CPU-bound; run it off the event loop
+    return await asyncio.to_thread(_normalize_image_sync, temp_path, max_dim)
 
 
-async def _detect_mime_from_file(path: Path) -> Optional[str]:
-    if magiclib is None:
+def _publish_upload(temp_path: Path, final_path: Path) -> None:
+    # rename is a metadata syscall that can stall on a busy disk; callers
+    # run this in a worker thread
+    os.replace(temp_path, final_path)
+
+
+# Leading signatures of the allowed formats; WEBP is a RIFF container and is
+# checked separately. A prefix compare here settles nearly every upload
+# without going through libmagic's full rule set.
+_IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def _sniff_image_header(head: bytes) -> Optional[str]:
+    for signature, mime in _IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _detect_mime_from_buffer(head: bytes) -> Optional[str]:
+    # works on bytes already in memory, so it's cheap enough to run inline
+    if _MAGIC is None or not head:
         return None
     try:
-        m = magiclib.Magic(mime=True)
-        return m.from_file(str(path))
+        with _MAGIC_LOCK:
+            return _MAGIC.from_buffer(head)
     except Exception:
         logger.exception("python-magic detection failed")
         return None
@@ -172,7 +263,35 @@ class RegisterAuthHub:
         self.cfg = cfg
         self.logger = logger
 
-    async def _stream_save(self, upload: UploadFile) -> Dict[str, Any]:
+    def _size_error(self) -> exception.BaseApiException:
+        return exception.BaseApiException(
+            message=f"Profile picture exceeds allowed size of {self.cfg.MAX_SIZE} bytes.",
+            status_code=400,
+        )
+
+    async def _write_batched(self, upload: UploadFile, fd: int, head: bytes = b"") -> int:
+        """Write `head` plus the rest of the upload via its async read(),
+        handing chunks to a worker thread in batches rather than one thread
+        hop per chunk. Stops once MAX_SIZE is exceeded and returns the byte
+        count seen so far."""
+        bytes_written = len(head)
+        pending: List[bytes] = [head] if head else []
+        while True:
+            chunk = await upload.read(self.cfg.CHUNK_SIZE)
+            if not chunk:
+                break
+            bytes_written += len(chunk)
+            if bytes_written > self.cfg.MAX_SIZE:
+                return bytes_written
+            pending.append(chunk)
+            if len(pending) >= self.cfg.WRITE_BATCH_CHUNKS:
+                await asyncio.to_thread(_write_chunks, fd, pending)
+                pending = []
+        if pending:
+            await asyncio.to_thread(_write_chunks, fd, pending)
+        return bytes_written
+
+    async def _stream_save(self, upload: UploadFile, file_id: Optional[str] = None) -> Dict[str, Any]:
         """Stream upload to disk atomically, optionally normalize image, and return metadata."""
         original = upload.filename or ""
         if not original:
@@ -186,46 +305,70 @@ class RegisterAuthHub:
                 status_code=400,
             )
 
-        target_name = _generate_uuid_filename(ext)
+        target_name = _generate_uuid_filename(ext, file_id)
         temp_path = self.cfg.UPLOAD_DIR / (target_name + ".tmp")
         final_path = self.cfg.UPLOAD_DIR / target_name
 
-        bytes_written = 0
+        # fast-path rejects, before any bytes touch the disk
+        known_size = getattr(upload, "size", None)
+        if isinstance(known_size, int) and known_size > self.cfg.MAX_SIZE:
+            raise self._size_error()
+
         try:
-            # write stream to temporary file with aiofiles
-            async with aiofiles.open(temp_path, "wb") as f:
-                while True:
-                    chunk = await upload.read(self.cfg.CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    await f.write(chunk)
-                    bytes_written += len(chunk)
-                    if bytes_written > self.cfg.MAX_SIZE:
-                        # remove partial and raise
-                        try:
-                            await f.close()
-                        except Exception:
-                            pass
-                        temp_path.unlink(missing_ok=True)
-                        raise exception.BaseApiException(
-                            message=f"Profile picture exceeds allowed size of {self.cfg.MAX_SIZE} bytes.",
-                            status_code=400,
-                        )
-
-            # optionally detect mime (if python-magic installed) and validate
-            mime = await _detect_mime_from_file(temp_path)
+            # sniff the MIME type from the head of the stream, held in memory
+            head = await upload.read(self.cfg.SNIFF_SIZE)
+            if not head:
+                # an empty file is no image (libmagic would call it inode/x-empty)
+                raise exception.BaseApiException(message="Uploaded file is not a valid image.", status_code=400)
+            # python-magic (if installed) only sees unrecognised headers
+            mime = _sniff_image_header(head) or _detect_mime_from_buffer(head)
             if mime and not mime.startswith(self.cfg.ALLOWED_MIMES_PREFIX):
-                temp_path.unlink(missing_ok=True)
                 raise exception.BaseApiException(message="Uploaded file is not a valid image.", status_code=400)
 
-            # optional image normalization (resize/compress)
-            await _maybe_normalize_image(temp_path, self.cfg.IMAGE_MAX_DIM)
-
-            # final size after normalization
-            final_size = temp_path.stat().st_size
-
-            # atomic replace
-            os.replace(str(temp_path), str(final_path))
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                preallocated = isinstance(known_size, int) and known_size > 0 and _preallocate(fd, known_size)
+                source = getattr(upload, "file", None)
+                if callable(getattr(source, "readinto", None)):
+                    # spooled upload: copy it into the fd through one reused
+                    # buffer, all inside a single worker-thread call. When the
+                    # size is known and small, size the buffer to fit it so the
+                    # copy is a single read/write pair.
+                    buf_size = self.cfg.CHUNK_SIZE
+                    if isinstance(known_size, int) and 0 <= known_size < buf_size:
+                        buf_size = known_size + 1
+                    bytes_written = await asyncio.to_thread(
+                        _copy_into_fd, source, fd, buf_size, self.cfg.MAX_SIZE, head
+                    )
+                else:
+                    bytes_written = await self._write_batched(upload, fd, head)
+                if bytes_written > self.cfg.MAX_SIZE:
+                    raise self._size_error()
+                if preallocated and bytes_written != known_size:
+                    # reported size was off; trim the reserved tail
+                    os.ftruncate(fd, bytes_written)
+            except exception.BaseApiException:
+                # remove partial and re-raise
+                os.close(fd)
+                fd = -1
+                await asyncio.to_thread(temp_path.unlink, missing_ok=True)
+                raise
+            finally:
+                if fd >= 0:
+                    os.close(fd)
+
+            # optional image normalization (resize/compress); it reports the
+            # rewritten size. Without Pillow the file is exactly what was
+            # copied; only a failed rewrite needs a stat to find out.
+            if Image is None:
+                final_size = bytes_written
+            else:
+                final_size = await _maybe_normalize_image(temp_path, self.cfg.IMAGE_MAX_DIM)
+                if final_size is None:
+                    final_size = await asyncio.to_thread(os.path.getsize, temp_path)
+
+            # atomic replace, off the event loop
+            await asyncio.to_thread(_publish_upload, temp_path, final_path)
 
             # ensure upload object closed
             try:
@@ -246,11 +389,11 @@ class RegisterAuthHub:
         except Exception as exc:
             # attempt cleanup
             try:
-                temp_path.unlink(missing_ok=True)
+                await asyncio.to_thread(temp_path.unlink, missing_ok=True)
             except Exception:
                 pass
             try:
-                final_path.unlink(missing_ok=True)
+                await asyncio.to_thread(final_path.unlink, missing_ok=True)
             except Exception:
                 pass
             self.logger.exception("Failed to save upload: %s", exc)
@@ -285,7 +428,15 @@ class RegisterAuthHub:
                 raise exception.BaseApiException(message="User already exists.", status_code=400)
 
             # Hash password (store only hashed)
-            hashed_password = crypter.hashpw(modelData.password, method="scrypt", salt_length=16)
+            # scrypt is a deliberate CPU burst; keep it off the event loop
+            hashed_password = await asyncio.to_thread(
+                crypter.hashpw,
+                modelData.password,
+                method=self.cfg.PASSWORD_HASH_METHOD,
+                salt_length=self.cfg.PASSWORD_SALT_LENGTH,
+            )
+
+            user_id, file_id = _new_ids()
 
             # handle optional profile picture
             saved_profile: Optional[Dict[str, Any]] = None
@@ -298,20 +449,27 @@ class RegisterAuthHub:
                     raise exception.BaseApiException(message="Profile picture must be an image.", status_code=400)
 
                 # stream-save (validates ext, size, optional mime, normalization)
-                saved_profile = await self._stream_save(upload_file)
+                saved_profile = await self._stream_save(upload_file, file_id)
 
             # prepare OTP and rate-limit per session
             otp_code = _generate_otp()
-            otp_expires = (datetime.utcnow() + timedelta(minutes=self.cfg.OTP_EXPIRES_MINUTES)).isoformat()
-
-            # simple per-session OTP rate-limiting
-            otp_count = request.session["otp_sent_count"] or 0
+            # one clock read per request, reused for every timestamp below
+            now = datetime.utcnow()
+            now_iso = now.isoformat()
+            otp_expires_dt = now + timedelta(minutes=self.cfg.OTP_EXPIRES_MINUTES)
+            # stored as epoch seconds so verify compares ints instead of parsing
+            # ISO; the ISO form is only rendered for the email
+            otp_expires = int(otp_expires_dt.replace(tzinfo=timezone.utc).timestamp())
+
+            # simple per-session OTP rate-limiting. Read and write go through
+            # request.session with no await in between, so concurrent requests
+            # on the same session can't both pass the check on a stale count.
+            otp_count = int(request.session.get("otp_sent_count") or 0)
             if otp_count >= self.cfg.OTP_MAX_PER_SESSION:
                 raise exception.BaseApiException(message="OTP send limit reached for this session.", status_code=429)
-            await self.session.set("otp_sent_count", otp_count + 1)
+            request.session["otp_sent_count"] = otp_count + 1
 
             # compose DB document (do not persist confirmPassword)
-            user_id = str(uuid.uuid4())
             user_doc = {
                 "collectionId": FieldOp.AUTO_INC.value,
                 "userId": user_id,
@@ -358,7 +516,7 @@ class RegisterAuthHub:
                     # cleanup file if any
                     if saved_profile:
                         try:
-                            Path(saved_profile["path"]).unlink(missing_ok=True)
+                            await asyncio.to_thread(Path(saved_profile["path"]).unlink, missing_ok=True)
                         except Exception:
                             logger.exception("Failed to cleanup profile image after DB insert failed")
                     raise exception.BaseApiException(message="Failed to register user.", status_code=500)
@@ -372,8 +530,6 @@ class RegisterAuthHub:
                         "details": {"studentId": modelData.studentId, "email": modelData.email},
                         "timestamps": {"createdAt": FieldOp.DATETIME.value, "updatedAt": FieldOp.DATETIME.value},
                     }
-                    await connection.usercollectionlogs.insertOne(log_data)
-
                     metadata = {
                         "collectionId": result.inserted_id,
                         "userId": user_id,
@@ -382,12 +538,10 @@ class RegisterAuthHub:
                             "university": modelData.university,
                             "course": modelData.course,
                             "year": year_val,
-                            "createdAt": datetime.utcnow().isoformat(),
-                            "updatedAt": datetime.utcnow().isoformat(),
+                            "createdAt": now_iso,
+                            "updatedAt": now_iso,
                         },
                     }
-                    await connection.usercollectionmetadata.insertOne(metadata)
-
                     user_collection_data = {
                         "collectionId": result.inserted_id,
                         "userId": user_id,
@@ -396,10 +550,20 @@ class RegisterAuthHub:
                         "email": modelData.email,
                         "phone": modelData.phone,
                         "profile": saved_profile,
-                        "createdAt": datetime.utcnow().isoformat(),
-                        "updatedAt": datetime.utcnow().isoformat(),
+                        "createdAt": now_iso,
+                        "updatedAt": now_iso,
                     }
-                    await connection.usercollection.insertOne(user_collection_data)
+
+                    # independent writes; issue them concurrently
+                    outcomes = await asyncio.gather(
+                        connection.usercollectionlogs.insertOne(log_data),
+                        connection.usercollectionmetadata.insertOne(metadata),
+                        connection.usercollection.insertOne(user_collection_data),
+                        return_exceptions=True,
+                    )
+                    for name, outcome in zip(("logs", "metadata", "usercollection"), outcomes):
+                        if isinstance(outcome, Exception):
+                            logger.error("Non-fatal: failed to write user %s", name, exc_info=outcome)
                 except Exception:
                     logger.exception("Non-fatal: failed to write user metadata/logs")
 
@@ -409,7 +573,7 @@ class RegisterAuthHub:
                 # cleanup file if DB entirely failed
                 if saved_profile:
                     try:
-                        Path(saved_profile["path"]).unlink(missing_ok=True)
+                        await asyncio.to_thread(Path(saved_profile["path"]).unlink, missing_ok=True)
                     except Exception:
                         logger.exception("Failed to cleanup after DB error")
                 logger.exception("DB insert failed: %s", db_exc)
@@ -419,10 +583,12 @@ class RegisterAuthHub:
             session_data = {
                 "userId": user_id,
                 "email": user_doc["email"],
+                # lets resend greet the user without reading the document back
+                "name": {"firstName": modelData.firstName, "lastName": modelData.lastName},
                 "otp": user_doc["otp"],
                 "profilePic": saved_profile,
-                "createdAt": datetime.utcnow().isoformat(),
-                "updatedAt": datetime.utcnow().isoformat(),
+                "createdAt": now_iso,
+                "updatedAt": now_iso,
             }
             request.session["user_registration_data"] = session_data
             # Send verification email with retries (non-blocking)
@@ -430,29 +596,24 @@ class RegisterAuthHub:
                 "firstName": modelData.firstName,
                 "lastName": modelData.lastName,  
                 "otpCode": user_doc["otp"]["code"],
-                "expiresAt": user_doc["otp"]["expiresAt"],
+                "expiresAt": otp_expires_dt.isoformat(),
             }
 
-            ok = await _send_email_with_retries( 
-                subject="Email Verification for Resource Hub",
-                message="Please verify your email address.",
-                recipient=modelData.email,
-                context=context,
-            )
-
-            if not ok:
-                # optionally rollback registration or just warn — here we treat it as error 
-                logger.warning("Email sending failed for %s (user %s)", modelData.email, user_id)
-                raise exception.BaseApiException(message="Failed to send verification email.", status_code=500)
+            # the response doesn't depend on SMTP, so don't hold it open for
+            # the send and its retries; failures are flagged on the user doc
+            background.spawn_background(background.send_verification_email(
+                modelData.email, context, {"userId": user_id},
+                cfg.MAIL_RETRY_ATTEMPTS, cfg.MAIL_RETRY_DELAY_SECONDS,
+            ))
 
-            return responses.JsonResponse(content={"message": "User registration successful"})
+            return JsonResponse(content={"message": "User registration successful"})
 
         except exception.BaseApiException as e:
-            return responses.JsonResponse(content={"error": e.message}, status=e.status_code)
+            return JsonResponse(content={"error": e.message}, status=e.status_code)
 
         except Exception as e:
             logger.exception("Unexpected error in registerhub: %s", e)
-            return responses.JsonResponse(content={"error": "An unexpected error occurred: " + str(e)}, status=500)
+            return JsonResponse(content={"error": "An unexpected error occurred: " + str(e)}, status=500)
 
 
 # module-level singleton for import
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+import random
+from typing import Any, Dict, Optional, Set
+
+from ... import connection
+from . import mailer
+
+logger = logging.getLogger(__name__)
+
+VERIFICATION_SUBJECT = "Email Verification for Resource Hub"
+VERIFICATION_MESSAGE = "Please verify your email address."
+VERIFICATION_TEMPLATE = "email_templates/email_verification.html"
+
+# strong refs to fire-and-forget tasks so they aren't garbage-collected mid-flight
+_BG_TASKS: Set[asyncio.Task] = set()
+
+
+def spawn_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _BG_TASKS.add(task)
+    task.add_done_callback(_BG_TASKS.discard)
+    return task
+
+
+async def send_email_with_retries(recipient: str, context: Dict[str, Any], attempts: int, delay: float) -> bool:
+    """Send the verification email, retrying failures; True once one is accepted."""
+    last_exc: Optional[Exception] = None
+    for attempt in range(1, attempts + 1):
+        try:
+            # native async SMTP on a persistent session (reconnects after a
+            # failed send); no worker thread is held for the handshake + DATA
+            result = await mailer.send_email_async(
+                VERIFICATION_SUBJECT,
+                VERIFICATION_MESSAGE,
+                recipient,
+                context,
+                VERIFICATION_TEMPLATE,
+            )
+            if result:
+                return True
+            last_exc = Exception("mailer.send_email_async returned falsy")
+        except Exception as exc:
+            last_exc = exc
+            logger.warning("Mailer attempt %d failed: %s", attempt, exc)
+        if attempt < attempts:
+            # exponential backoff with full jitter, so a burst of failed
+            # sends doesn't retry against the SMTP server in lockstep
+            await asyncio.sleep(random.uniform(0, delay * 2 ** (attempt - 1)))
+    logger.error("All mail attempts failed: %s", last_exc)
+    return False
+
+
+async def send_verification_email(
+    recipient: str, context: Dict[str, Any], flag_filter: Dict[str, Any], attempts: int, delay: float
+) -> None:
+    """Send the verification email; if every attempt fails, set
+    status.emailDispatchFailed on the registration matching `flag_filter`
+    (surfaced to clients through the verify `status` endpoint).
+    """
+    if await send_email_with_retries(recipient, context, attempts, delay):
+        return
+    logger.warning("Verification email failed for %s", recipient)
+    try:
+        await connection.shallowuserregistration.update(
+            flag_filter,
+            {"$set": {"status.emailDispatchFailed": True}},
+        )
+    except Exception:
+        logger.exception("Failed to flag email dispatch failure for %s", recipient)
@@ -0,0 +1,41 @@
+import json
+from typing import Dict, Optional, Union
+
+from aquilify import responses
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+
+def dumps(content) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False).encode("utf-8")
+
+
+def loads(data: Union[str, bytes]):
+    """Parse JSON text or bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class JsonResponse(responses.JsonResponse):
+    """Drop-in for aquilify's JsonResponse that encodes with orjson.
+
+    aquilify runs json.dumps and then re-encodes the str when sending;
+    orjson produces the body bytes in one step. Call sites stay identical.
+    """
+    def __init__(
+        self,
+        content: Union[Dict, None] = {},
+        status: Optional[int] = 200,
+        headers: Optional[Dict[str, Union[str, int]]] = None,
+        content_type: str = 'application/json',
+        encoding: Optional[str] = 'utf-8',
+    ) -> None:
+        responses.BaseResponse.__init__(self, dumps(content), status, headers)
+        self.headers.setdefault('Content-Type', f'{content_type}; charset={encoding}')
@@ -1,8 +1,44 @@
+import asyncio
+import logging
+from email.message import EmailMessage
+from functools import lru_cache
+
+import jinja2
 from aquilify.core import mail
 from aquilify.core.mail import BadHeaderError
-from aquilify import shortcuts
 from aquilify.settings import settings
 
+try:
+    import aiosmtplib
+except Exception:
+    aiosmtplib = None
+
+logger = logging.getLogger(__name__)
+
+# A few SMTP sessions reused across sends (saves a TCP + TLS handshake and a
+# login per email). Each send borrows an idle one; the semaphore bounds how
+# many are in use at once, so a burst of sends goes out in parallel without
+# opening a connection per email.
+SMTP_POOL_SIZE = 4
+_smtp_idle = []
+_smtp_slots = asyncio.Semaphore(SMTP_POOL_SIZE)
+
+@lru_cache(maxsize=None)
+def _get_template(template_name: str) -> jinja2.Template:
+    # shortcuts.render_from_string builds a new Environment (and so re-reads
+    # and re-compiles the template) per call; compile each template once.
+    # Autoescape like that renderer does: contexts carry user-supplied names
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(settings.TEMPLATES[0].get('DIRS')),
+        autoescape=jinja2.select_autoescape(['html', 'xml']),
+    )
+    return env.get_template(template_name)
+
+
+def _render_template(template_name: str, context: dict) -> str:
+    return _get_template(template_name).render(context or {})
+
+
 def send_email(subject: str, message:str, recipient: str, context: dict, template_name: str ):
     try:
         
@@ -12,9 +48,7 @@ def send_email(subject: str, message:str, recipient: str, context: dict, templat
         from_name = f"Resource Hub Team"
         from_email_with_name = f'"{from_name}" <{from_email}>'
         recipient_list = [recipient]
-        html_message = shortcuts.render_from_string(
-                template_name = template_name, context = context if context else None
-            )
+        html_message = _render_template(template_name, context)
         
         mail.send_mail(
             subject,
@@ -26,4 +60,60 @@ def send_email(subject: str, message:str, recipient: str, context: dict, templat
         return True
     except (BadHeaderError, Exception) as e:
         print(f"Error sending email: {e}")
-        return False  # Email failed to send
\ No newline at end of file
+        return False  # Email failed to send
+
+
+def _build_message(subject: str, message: str, recipient: str, context: dict, template_name: str) -> EmailMessage:
+    email = EmailMessage()
+    email["Subject"] = subject
+    email["From"] = f'"Resource Hub Team" <{settings.DEFAULT_FROM_EMAIL}>'
+    email["To"] = recipient
+    email.set_content(message)
+    html_message = _render_template(template_name, context)
+    email.add_alternative(html_message, subtype="html")
+    return email
+
+
+async def _connect_smtp():
+    smtp = aiosmtplib.SMTP(
+        hostname=settings.EMAIL_HOST,
+        port=settings.EMAIL_PORT,
+        use_tls=settings.EMAIL_USE_SSL,
+        start_tls=settings.EMAIL_USE_TLS,
+        timeout=settings.EMAIL_TIMEOUT,
+    )
+    await smtp.connect()
+    if settings.EMAIL_HOST_USER:
+        await smtp.login(settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD)
+    return smtp
+
+
+async def send_email_async(subject: str, message: str, recipient: str, context: dict, template_name: str):
+    # Native asyncio SMTP when aiosmtplib is installed; otherwise run the
+    # blocking sender in a worker thread.
+    if aiosmtplib is None:
+        return await asyncio.to_thread(send_email, subject, message, recipient, context, template_name)
+    try:
+        email = _build_message(subject, message, recipient, context, template_name)
+    except Exception:
+        logger.exception("Error building email to %s", recipient)
+        return False
+    async with _smtp_slots:
+        smtp = None
+        try:
+            while _smtp_idle and smtp is None:
+                smtp = _smtp_idle.pop()
+                if not smtp.is_connected:
+                    smtp.close()
+                    smtp = None
+            if smtp is None:
+                smtp = await _connect_smtp()
+            await smtp.send_message(email)
+        except Exception:
+            logger.exception("Error sending email to %s", recipient)
+            # drop the session so a later send reconnects from scratch
+            if smtp is not None:
+                smtp.close()
+            return False
+        _smtp_idle.append(smtp)
+        return True
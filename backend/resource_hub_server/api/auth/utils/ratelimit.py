@@ -0,0 +1,54 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Tuple
+
+
+class TokenBucketLimiter:
+    """In-process token bucket per key: `capacity` burst, one token back every `refill_seconds`.
+
+    State is two floats per key, so a check is an O(1) dict lookup. The
+    least recently used keys are dropped beyond `max_keys`; a dropped key
+    simply starts again with a full bucket.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        refill_seconds: float,
+        max_keys: int = 100_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = float(capacity)
+        self.rate = 1.0 / refill_seconds
+        self.max_keys = max_keys
+        self.clock = clock
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, last = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - last) * self.rate)
+
+    def _retry_after(self, tokens: float) -> int:
+        # rounded first so float noise (e.g. 20.000000000000004) doesn't add a second
+        return max(1, math.ceil(round((1.0 - tokens) / self.rate, 6)))
+
+    def wait(self, key: str) -> int:
+        """Seconds until `key` has a token (0 if it has one now), without taking it."""
+        tokens = self._tokens(key, self.clock())
+        return 0 if tokens >= 1.0 else self._retry_after(tokens)
+
+    def hit(self, key: str) -> int:
+        """Take a token for `key`. Returns 0 if allowed, else the seconds until one is available."""
+        now = self.clock()
+        tokens = self._tokens(key, now)
+        if tokens >= 1.0:
+            self._buckets[key] = (tokens - 1.0, now)
+            retry_after = 0
+        else:
+            self._buckets[key] = (tokens, now)
+            retry_after = self._retry_after(tokens)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
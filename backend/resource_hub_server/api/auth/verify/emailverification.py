@@ -2,7 +2,7 @@
 
 Responsibilities:
 - Verify OTP for a given user/email
-- Resend OTP with per-session and per-user rate limiting
+- Resend OTP with per-user and per-IP rate limiting (token buckets)
 - Robust attempt counting & lockout
 - Clear, consistent state transitions in `otp` & `status`
 - Thorough error handling
@@ -15,18 +15,21 @@ Assumptions:
 Dependencies:
 - aquilify Request & responses
 - exception.BaseApiException(message: str, status_code: int)
-- utils.mailer.send_email(subject, message, recipient, context, template)
+- utils.background.send_verification_email (retried send off the request path)
 - axiomelectrus FieldOp for $datetime
 """
 from __future__ import annotations
 
-import ast
 import asyncio
 import logging
 import secrets
-from dataclasses import dataclass
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from hmac import compare_digest
+from typing import Any, Dict, Optional, Tuple
 
 from aquilify.wrappers import Request
 from aquilify.core.backend.sessions.localsessions import SessionManager
@@ -35,7 +38,9 @@ from aquilify import responses
 from axiomelectrus.partials.insert import FieldOp
 
 from ... import exception, connection
-from ..utils import mailer
+from ..utils import background, jsonresponse
+from ..utils.jsonresponse import JsonResponse
+from ..utils.ratelimit import TokenBucketLimiter
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -48,13 +53,65 @@ logger.setLevel(logging.INFO)
 class Config:
     OTP_EXPIRES_MINUTES: int = 10
     OTP_VERIFY_MAX_ATTEMPTS: int = 5          # per-user verify attempts before lockout
-    OTP_RESEND_MAX_PER_SESSION: int = 5       # per-session resend limit
-    OTP_RESEND_COOLDOWN_SECONDS: int = 30     # min gap between resends for a single user
+    OTP_RESEND_BURST: int = 1                 # per user: one resend per refill interval (30 s cooldown)
+    OTP_RESEND_IP_BURST: int = 20             # resends a single client IP can make back to back
+    OTP_RESEND_REFILL_SECONDS: float = 30     # one more resend allowed per interval, per bucket
     MAIL_RETRY_ATTEMPTS: int = 3
     MAIL_RETRY_DELAY_SECONDS: float = 0.5
+    VERIFIED_CACHE_TTL_SECONDS: float = 60.0  # how long a verified user skips the DB
+    VERIFIED_CACHE_MAX_ENTRIES: int = 10_000
+    ATTEMPT_FLUSH_INTERVAL_SECONDS: float = 0.05  # how long wrong-OTP increments are coalesced
+    ATTEMPT_FLUSH_MAX_EMAILS: int = 100           # flush early once this many users are pending
 
 cfg = Config()
 
+# Hot-path values bound once, instead of attribute chains per comparison
+_MAX_ATTEMPTS = cfg.OTP_VERIFY_MAX_ATTEMPTS
+_OTP_LIFETIME = timedelta(minutes=cfg.OTP_EXPIRES_MINUTES)
+_VERIFIED_TTL = cfg.VERIFIED_CACHE_TTL_SECONDS
+_VERIFIED_MAX = cfg.VERIFIED_CACHE_MAX_ENTRIES
+
+
+@dataclass(frozen=True, slots=True)
+class OtpState:
+    """The `otp` subdocument, read once per request into typed slots."""
+    code: str
+    expires_at: Any            # as stored: epoch int (or ISO string on older docs)
+    count: int
+    max_count: int
+    is_verified: bool
+    is_used: bool
+    is_expired: bool
+
+    @classmethod
+    def from_raw(cls, raw: Optional[Dict[str, Any]]) -> "OtpState":
+        raw = raw or {}
+        get = raw.get
+        return cls(
+            code=str(get("code") or ""),
+            expires_at=get("expiresAt"),
+            count=int(get("count") or 0),
+            max_count=int(get("maxCount") or _MAX_ATTEMPTS),
+            is_verified=get("isVerified") is True,
+            is_used=get("isUsed") is True,
+            is_expired=get("isExpired") is True,
+        )
+
+    def to_status(self, pending_attempts: int = 0) -> Dict[str, Any]:
+        return {
+            "isVerified": self.is_verified,
+            "isExpired": self.is_expired,
+            "isUsed": self.is_used,
+            "attempts": self.count + pending_attempts,
+            "maxAttempts": self.max_count,
+            "expiresAt": _expires_iso(self.expires_at),
+        }
+
+
+# Only these fields are read back; selecting them keeps Electrus from
+# materialising (and flattening) the whole user document per request.
+_VERIFY_FIELDS = ("otp", "status")
+
 
 # ---------------------------
 # Helpers
@@ -64,10 +121,20 @@ def _now_utc() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _to_iso(dt: datetime) -> str:
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.isoformat()
+def _expires_epoch(value: Any) -> Optional[float]:
+    """`otp.expiresAt` as epoch seconds. New documents store an int; older
+    ones hold an ISO string, which is parsed as before."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    dt = _parse_iso(value) if isinstance(value, str) else None
+    return dt.timestamp() if dt else None
+
+
+def _expires_iso(value: Any) -> Optional[str]:
+    """Render `otp.expiresAt` for clients, whichever form is stored."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, timezone.utc).isoformat()
+    return value
 
 
 def _parse_iso(ts: str | None) -> Optional[datetime]:
@@ -83,11 +150,49 @@ def _parse_iso(ts: str | None) -> Optional[datetime]:
         return None
 
 
-def _constant_time_eq(a: str, b: str) -> bool:
+async def _read_payload(request: Request) -> Optional[Dict[str, Any]]:
+    """The JSON body as a dict, or None if a JSON body is malformed.
+
+    Bodies declared as something other than JSON aren't read at all; an
+    empty body or a non-object is {} (so the session email can apply).
+    Decoded straight from the raw bytes by orjson when available.
+    """
+    content_type = request.headers.get("content-type") or ""
+    if content_type and "json" not in content_type.lower():
+        return {}
+    body = await request.body()
+    if not body:
+        return {}
     try:
-        return secrets.compare_digest(a, b)
-    except Exception:
-        return False
+        data = jsonresponse.loads(body)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else {}
+
+
+def _registration_session(request: Request) -> Dict[str, Any]:
+    """The registration payload from the session, as a dict.
+
+    RegisterAuthHub stores a dict; a backend that serialises sessions may
+    hand it back as JSON text, which is decoded here (never via ast).
+    """
+    data = request.session.get("user_registration_data")
+    if isinstance(data, (str, bytes)):
+        try:
+            data = jsonresponse.loads(data)
+        except ValueError:
+            return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _request_email(request: Request, data: Dict[str, Any]) -> Optional[str]:
+    """The email from the body, else from the registration session.
+
+    None unless it is a non-empty string: it keys dicts and locks below,
+    so a JSON object or list there must be a 400, not a TypeError.
+    """
+    email = data.get("email") or _registration_session(request).get("email")
+    return email if isinstance(email, str) and email else None
 
 
 def _generate_otp() -> str:
@@ -95,27 +200,151 @@ def _generate_otp() -> str:
     return f"{secrets.randbelow(900000) + 100000:06d}"
 
 
-async def _send_email_with_retries(subject: str, message: str, recipient: str, context: Dict[str, Any], attempts: int = cfg.MAIL_RETRY_ATTEMPTS) -> bool:
-    last_exc: Optional[Exception] = None
-    for attempt in range(1, attempts + 1):
-        try:
-            result = await asyncio.to_thread(
-                mailer.send_email,
-                subject,
-                message,
-                recipient,
-                context,
-                "email_templates/email_verification.html",
-            )
-            if result:
-                return True
-            last_exc = Exception("mailer.send_email returned falsy")
-        except Exception as exc:
-            last_exc = exc
-            logger.warning("Mailer attempt %d failed: %s", attempt, exc)
-            await asyncio.sleep(cfg.MAIL_RETRY_DELAY_SECONDS * attempt)
-    logger.exception("All mail attempts failed: %s", last_exc)
-    return False
+# Verified users are the hot, read-only case (status polls, repeat verifies):
+# remember their status snapshot for a short while so those requests don't
+# hit Electrus. Only verified state is cached; anything else is read fresh.
+_verified_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+
+def _verified_cache_get(email: str) -> Optional[Dict[str, Any]]:
+    entry = _verified_cache.get(email)
+    if entry is None:
+        return None
+    expires, snapshot = entry
+    if time.monotonic() >= expires:
+        _verified_cache.pop(email, None)
+        return None
+    return snapshot
+
+
+def _verified_cache_put(email: str, otp: OtpState) -> None:
+    _verified_cache[email] = (time.monotonic() + _VERIFIED_TTL, otp.to_status())
+    _verified_cache.move_to_end(email)
+    while len(_verified_cache) > _VERIFIED_MAX:
+        _verified_cache.popitem(last=False)
+
+
+def _verified_cache_drop(email: str) -> None:
+    _verified_cache.pop(email, None)
+
+
+# One lock per email with a verify in flight, so concurrent verifies for the
+# same user run one at a time (the followers then see the cached result).
+# Weak values: a lock disappears once no request holds it.
+_email_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _email_lock(email: str) -> asyncio.Lock:
+    lock = _email_locks.get(email)
+    if lock is None:
+        lock = _email_locks[email] = asyncio.Lock()
+    return lock
+
+
+class _AttemptFlusher:
+    """Coalesces wrong-OTP attempt increments and writes them in the background.
+
+    Every Electrus update rewrites the collection file, so a brute-force run
+    of N wrong codes used to cost N rewrites. Increments are now summed per
+    email and written as one `$inc` per email every flush interval. Lockout
+    checks add `pending(email)` to the stored count, so they never lag.
+    """
+
+    def __init__(self, interval: float, max_emails: int) -> None:
+        self.interval = interval
+        self.max_emails = max_emails
+        # keyed by (email, OTP code the attempts were made against), so
+        # increments for a replaced OTP never land on its successor
+        self._pending: Dict[Tuple[str, str], int] = {}
+        # taken out of _pending but not yet acknowledged by the DB
+        self._inflight: Dict[Tuple[str, str], int] = {}
+        self._timer: Optional[asyncio.Task] = None
+        self._tasks: set = set()
+
+    def pending(self, email: str, code: str) -> int:
+        key = (email, code)
+        return self._pending.get(key, 0) + self._inflight.get(key, 0)
+
+    def submit(self, email: str, code: str) -> None:
+        key = (email, code)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        if len(self._pending) >= self.max_emails:
+            self._spawn(self.flush())
+        elif self._timer is None:
+            self._timer = self._spawn(self._flush_later())
+
+    def discard(self, email: str) -> None:
+        """Forget increments for `email`'s current OTP (the counter is being reset).
+
+        Writes already under way are conditional on the old code, so they
+        can't touch the new OTP either.
+        """
+        for counts in (self._pending, self._inflight):
+            for key in [key for key in counts if key[0] == email]:
+                del counts[key]
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.interval)
+        self._timer = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        batch, self._pending = self._pending, {}
+        if not batch:
+            return
+        for key, n in batch.items():
+            self._inflight[key] = self._inflight.get(key, 0) + n
+        updated_at = f"{_now_utc():%Y-%m-%d %H:%M:%S}"
+        for (email, code), n in batch.items():
+            try:
+                # only while that OTP is still the stored one: a resend in
+                # between reset the count for a new code
+                await connection.shallowuserregistration.update(
+                    {"email": email, "otp.code": code},
+                    {"$inc": {"otp.count": n}, "$set": {"timestamps.updatedAt": updated_at}},
+                )
+            except Exception:
+                logger.exception("Failed to increment OTP attempts for %s", email)
+            finally:
+                left = self._inflight.get((email, code), 0) - n
+                if left > 0:
+                    self._inflight[(email, code)] = left
+                else:
+                    self._inflight.pop((email, code), None)
+
+
+_attempts = _AttemptFlusher(cfg.ATTEMPT_FLUSH_INTERVAL_SECONDS, cfg.ATTEMPT_FLUSH_MAX_EMAILS)
+
+
+async def flush_pending_attempts() -> None:
+    """Shutdown hook (LIFESPAN_EVENTS): write out any coalesced attempt increments."""
+    await _attempts.flush()
+
+
+# Resend limits live server-side, keyed by email and by client IP, so they
+# can't be reset by dropping the session cookie.
+_resend_by_email = TokenBucketLimiter(cfg.OTP_RESEND_BURST, cfg.OTP_RESEND_REFILL_SECONDS)
+_resend_by_ip = TokenBucketLimiter(cfg.OTP_RESEND_IP_BURST, cfg.OTP_RESEND_REFILL_SECONDS)
+
+
+def _verified_update(now_str: str) -> Dict[str, Any]:
+    """Mark verified & consume the OTP."""
+    return {
+        "$set": {
+            "otp.isVerified": True,
+            "otp.isUsed": True,
+            "otp.isExpired": False,
+            "status.isEmailVerified": True,
+            "timestamps.updatedAt": now_str,
+        },
+        "$unset": {"otp.code": "", "otp.expiresAt": ""},  # no longer needed
+    }
 
 
 # ---------------------------
@@ -129,229 +358,259 @@ class EmailVerification:
 
     # ---------- Verify OTP ----------
     async def verify(self, request: Request) -> responses.JsonResponse:
-        try:
-            data = await request.json()
-        except Exception:
-            data = {}
-        email: Optional[str] = (data.get("email") if isinstance(data, dict) else None) or request.session.get("user_registration_data", {}).get("email")
-        code: Optional[str] = (data.get("otp") if isinstance(data, dict) else None)
+        data = await _read_payload(request)
+        if data is None:
+            return JsonResponse(content={"error": "Invalid JSON body."}, status=400)
+        email = _request_email(request, data)
+        code: Optional[str] = data.get("otp")
 
         if not email:
-            return responses.JsonResponse(content={"error": "Email is required."}, status=400)
-        if not code or len(code) != 6:
-            return responses.JsonResponse(content={"error": "Invalid OTP code."}, status=400)
+            return JsonResponse(content={"error": "Email is required."}, status=400)
+        # exactly six ASCII digits, so the compare below can't raise
+        if not isinstance(code, str) or len(code) != 6 or not (code.isascii() and code.isdigit()):
+            return JsonResponse(content={"error": "Invalid OTP code."}, status=400)
+
+        if _verified_cache_get(email) is not None:
+            return JsonResponse(content={"message": "Email already verified."}, status=200)
+
+        async with _email_lock(email):
+            # a verify that held the lock before us may have just succeeded
+            if _verified_cache_get(email) is not None:
+                return JsonResponse(content={"message": "Email already verified."}, status=200)
+            return await self._verify_user(request, email, code)
+
+    async def _verify_user(self, request: Request, email: str, code: str) -> responses.JsonResponse:
+        # one clock read for the expiry check and every timestamp written below
+        now = _now_utc()
+        now_str = f"{now:%Y-%m-%d %H:%M:%S}"
+
+        # Fast path: a correct, live code is consumed by one conditional
+        # update, with no read first. Any miss (wrong/expired code, lockout,
+        # already verified, legacy ISO expiry) falls through to the read
+        # below, which tells those cases apart.
+        try:
+            result = await connection.shallowuserregistration.update(
+                {
+                    "email": email,
+                    "otp.code": code,
+                    "otp.isVerified": False,
+                    "otp.isUsed": False,
+                    "otp.expiresAt": {"$gt": now.timestamp()},
+                    "otp.maxCount": _MAX_ATTEMPTS,
+                    # not "$lt": Electrus reads a falsy field (count 0) as +inf there
+                    "otp.count": {"$not": {"$gte": _MAX_ATTEMPTS - _attempts.pending(email, code)}},
+                    "status.isEmailVerified": False,
+                },
+                _verified_update(now_str),
+            )
+        except Exception:
+            # e.g. an ISO-string expiresAt can't be compared with a number
+            result = None
+        if getattr(result, "modified_count", 0):
+            return self._verified(request, email, now)
 
         # Load the user by email
         try:
-            user = await connection.shallowuserregistration.find().where(email = email).execute()
+            user = await connection.find_user_by_email(email, _VERIFY_FIELDS)
         except Exception as exc:
             self.logger.exception("DB error while fetching user for verify: %s", exc)
-            return responses.JsonResponse(content={"error": "Server error."}, status=500)
+            return JsonResponse(content={"error": "Server error."}, status=500)
 
-        if not user.acknowledged:
-            return responses.JsonResponse(content={"error": "User not found."}, status=404)
-        
-        user = user.raw_result[0] if isinstance(user.raw_result, list) else user.raw_result
+        if user is None:
+            return JsonResponse(content={"error": "User not found."}, status=404)
 
-        otp: Dict[str, Any] = (user.get("otp") or {})
-        status_doc: Dict[str, Any] = (user.get("status") or {})
+        otp = OtpState.from_raw(user.get("otp"))
+        email_verified = (user.get("status") or {}).get("isEmailVerified") is True
 
         # Already verified?
-        if status_doc.get("isEmailVerified") is True or otp.get("isVerified") is True or otp.get("isUsed") is True:
-            return responses.JsonResponse(content={"message": "Email already verified."}, status=200)
+        if email_verified or otp.is_verified or otp.is_used:
+            if email_verified:
+                _verified_cache_put(email, otp)
+            return JsonResponse(content={"message": "Email already verified."}, status=200)
 
-        # Attempt / lockout checks
-        attempts = int(otp.get("count") or 0)
-        max_attempts = int(otp.get("maxCount") or self.cfg.OTP_VERIFY_MAX_ATTEMPTS)
-        if attempts >= max_attempts:
-            return responses.JsonResponse(content={"error": "Maximum verification attempts exceeded. Please request a new OTP."}, status=429)
+        # Attempt / lockout checks (including increments not yet written)
+        if otp.count + _attempts.pending(email, otp.code) >= otp.max_count:
+            return JsonResponse(content={"error": "Maximum verification attempts exceeded. Please request a new OTP."}, status=429)
 
         # Expiry check
-        expires_at = _parse_iso(otp.get("expiresAt"))
-        if not expires_at or _now_utc() > expires_at:
-            # mark expired
-            try:
-                await connection.shallowuserregistration.update(
-                    {"email": email},
-                    {"$set": {"otp.isExpired": True, "timestamps.updatedAt": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")}},
-                )
-            except Exception:
-                self.logger.exception("Failed to mark OTP expired for %s", email)
-            return responses.JsonResponse(content={"error": "OTP has expired. Please request a new OTP."}, status=410)
+        expires_at = _expires_epoch(otp.expires_at)
+        if expires_at is None or now.timestamp() > expires_at:
+            # mark expired (once; retries against an expired OTP skip the write)
+            if not otp.is_expired:
+                try:
+                    await connection.shallowuserregistration.update(
+                        {"email": email},
+                        {"$set": {"otp.isExpired": True, "timestamps.updatedAt": now_str}},
+                    )
+                except Exception:
+                    self.logger.exception("Failed to mark OTP expired for %s", email)
+            return JsonResponse(content={"error": "OTP has expired. Please request a new OTP."}, status=410)
 
         # Compare
-        stored_code = str(otp.get("code") or "")
-        if not _constant_time_eq(stored_code, code):
-            # increment attempts
-            try:
-                await connection.shallowuserregistration.update(
-                    {"email": email},
-                    {"$inc": {"otp.count": 1}, "$set": {"timestamps.updatedAt": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")}},
-                )
-            except Exception:
-                self.logger.exception("Failed to increment OTP attempts for %s", email)
-            return responses.JsonResponse(content={"error": "Incorrect OTP."}, status=400)
+        if not compare_digest(otp.code.encode(), code.encode()):
+            # increment attempts; written by the background flusher
+            _attempts.submit(email, otp.code)
+            return JsonResponse(content={"error": "Incorrect OTP."}, status=400)
 
         # Success — mark verified & consume OTP
         try:
-            update = {
-                "$set": {
-                    "otp.isVerified": True,
-                    "otp.isUsed": True,
-                    "otp.isExpired": False,
-                    "status.isEmailVerified": True,
-                    "timestamps.updatedAt": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
-                },
-                "$unset": {"otp.code": "", "otp.expiresAt": ""},  # no longer needed
-            }
-            result = await connection.shallowuserregistration.update({"email": email}, update)
+            result = await connection.shallowuserregistration.update({"email": email}, _verified_update(now_str))
             if not getattr(result, "acknowledged", True):
-                return responses.JsonResponse(content={"error": "Failed to mark email verified."}, status=500)
+                _verified_cache_drop(email)
+                return JsonResponse(content={"error": "Failed to mark email verified."}, status=500)
         except Exception as exc:
+            _verified_cache_drop(email)
             self.logger.exception("DB error while marking verified: %s", exc)
-            return responses.JsonResponse(content={"error": "Server error while updating verification state."}, status=500)
+            return JsonResponse(content={"error": "Server error while updating verification state."}, status=500)
+
+        # the document now matches this snapshot (code/expiresAt were unset)
+        _verified_cache_put(email, replace(otp, is_verified=True, is_used=True, is_expired=False, expires_at=None))
+        return self._verified(request, email, now)
 
+    def _verified(self, request: Request, email: str, now: datetime) -> responses.JsonResponse:
         # Update session best-effort
         try:
-            sess = request.session.get("user_registration_data") or {}
+            sess = _registration_session(request)
             sess["otp"] = {"isVerified": True, "isUsed": True, "isExpired": False}
-            sess.setdefault("updatedAt", _to_iso(_now_utc()))
+            sess.setdefault("updatedAt", now.isoformat())
             request.session["user_registration_data"] = sess
         except Exception:
             self.logger.exception("Failed to update session after verify for %s", email)
 
-        return responses.JsonResponse(content={"message": "Email verified successfully."}, status=200)
+        return JsonResponse(content={"message": "Email verified successfully."}, status=200)
 
     # ---------- Resend OTP ----------
     async def resend(self, request: Request) -> responses.JsonResponse:
-        try:
-            data = await request.json()
-        except Exception:
-            data = {}
-        email: Optional[str] = (data.get("email") if isinstance(data, dict) else None) or request.session.get("user_registration_data", {}).get("email")
+        data = await _read_payload(request)
+        if data is None:
+            return JsonResponse(content={"error": "Invalid JSON body."}, status=400)
+        email = _request_email(request, data)
 
         if not email:
-            return responses.JsonResponse(content={"error": "Email is required."}, status=400)
-
-        # Per-session rate limit
-        session_key = "otp_resend_count"
-        last_sent_key = "otp_last_sent_at"
-        resend_count = int(request.session.get(session_key) or 0)
-        if resend_count >= self.cfg.OTP_RESEND_MAX_PER_SESSION:
-            return responses.JsonResponse(content={"error": "OTP resend limit reached for this session."}, status=429)
-
-        last_sent_iso = request.session.get(last_sent_key)
-        if last_sent_iso:
-            last_sent = _parse_iso(last_sent_iso)
-            if last_sent and (_now_utc() - last_sent).total_seconds() < self.cfg.OTP_RESEND_COOLDOWN_SECONDS:
-                return responses.JsonResponse(content={"error": "Please wait before requesting another OTP."}, status=429)
-
-        # Load user
-        try:
-            user = await connection.shallowuserregistration.find().where(email = email).execute()
-        except Exception as exc:
-            self.logger.exception("DB error while fetching user for resend: %s", exc)
-            return responses.JsonResponse(content={"error": "Server error."}, status=500)
-
-        if not user.acknowledged:
-            return responses.JsonResponse(content={"error": "User not found."}, status=404)
-        
-        user = user.raw_result[0] if isinstance(user.raw_result, list) else user.raw_result
+            return JsonResponse(content={"error": "Email is required."}, status=400)
+
+        # Rate limit per user and per client, before any DB work. Both buckets
+        # are checked before either is charged, so a client refused by one
+        # doesn't also spend the other. The key is the email as given, the
+        # same string the lookup below matches (emails are stored verbatim).
+        # not request.remote_addr: it raises when scope["client"] is None
+        # (e.g. served over a UNIX socket)
+        client = (request.scope.get("client") or ("",))[0] or ""
+        retry_after = max(_resend_by_email.wait(email), _resend_by_ip.wait(client))
+        if retry_after:
+            return JsonResponse(
+                content={"error": "Please wait before requesting another OTP."},
+                status=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+        _resend_by_email.hit(email)
+        _resend_by_ip.hit(client)
 
-        status_doc: Dict[str, Any] = (user.get("status") or {})
-        if status_doc.get("isEmailVerified") is True:
-            return responses.JsonResponse(content={"message": "Email already verified."}, status=200)
+        # a new OTP is about to be issued; never answer from the cache after this
+        _verified_cache_drop(email)
 
         # Generate new OTP & expiry, reset attempt counter/state
         new_code = _generate_otp()
-        new_expiry = _to_iso(_now_utc() + timedelta(minutes=self.cfg.OTP_EXPIRES_MINUTES))
+        now = _now_utc()
+        new_expiry_dt = now + _OTP_LIFETIME
+        new_expiry = new_expiry_dt.isoformat()
 
         update = {
             "$set": {
                 "otp.code": new_code,
-                "otp.expiresAt": new_expiry,
+                "otp.expiresAt": int(new_expiry_dt.timestamp()),
                 "otp.isVerified": False,
                 "otp.isUsed": False,
                 "otp.isExpired": False,
-                "timestamps.updatedAt": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+                "status.emailDispatchFailed": False,
+                "timestamps.updatedAt": f"{now:%Y-%m-%d %H:%M:%S}",
             },
             "$setOnInsert": {},
             "$unset": {},
             "$rename": {},
         }
         # Reset attempts when resending
+        _attempts.discard(email)
         update["$set"]["otp.count"] = 0
-        update["$set"]["otp.maxCount"] = int((user.get("otp") or {}).get("maxCount") or self.cfg.OTP_VERIFY_MAX_ATTEMPTS)
+        # (otp.maxCount is left as stored; OtpState defaults it when absent)
 
+        # Issue the new OTP to unverified users: one conditional update, no
+        # read on success (the name for the email comes from the session)
         try:
-            result = await connection.shallowuserregistration.update({"email": email}, update)
-            if not getattr(result, "acknowledged", True):
-                return responses.JsonResponse(content={"error": "Failed to issue new OTP."}, status=500)
+            issued = await connection.update_user_by_email(
+                email, update, {"status.isEmailVerified": {"$ne": True}}
+            )
+            if not issued:
+                # nothing updated: no such user, already verified, or a failed write
+                existing = await connection.find_user_by_email(email, ("status",))
+                if existing is None:
+                    return JsonResponse(content={"error": "User not found."}, status=404)
+                if (existing.get("status") or {}).get("isEmailVerified") is True:
+                    return JsonResponse(content={"message": "Email already verified."}, status=200)
+                return JsonResponse(content={"error": "Failed to issue new OTP."}, status=500)
         except Exception as exc:
             self.logger.exception("DB error while updating OTP for resend: %s", exc)
-            return responses.JsonResponse(content={"error": "Server error while issuing OTP."}, status=500)
+            return JsonResponse(content={"error": "Server error while issuing OTP."}, status=500)
 
-        # Email
+        # Email; only greet by name when the session belongs to this email
+        sess = _registration_session(request)
+        name = sess.get("name") if sess.get("email") == email else None
+        if not isinstance(name, dict):
+            name = {}
         context = {
-            "firstName": (user.get("name") or {}).get("firstName") or "",
-            "lastName": (user.get("name") or {}).get("lastName") or "",
+            "firstName": name.get("firstName") or "",
+            "lastName": name.get("lastName") or "",
             "otpCode": new_code,
             "expiresAt": new_expiry,
         }
 
-        ok = await _send_email_with_retries(
-            subject="Email Verification for Resource Hub",
-            message="Please verify your email address.",
-            recipient=email,
-            context=context,
-        )
-        if not ok:
-            return responses.JsonResponse(content={"error": "Failed to send verification email."}, status=500)
+        # the OTP is already issued; don't hold the response open for SMTP and
+        # its retries. A failed send sets status.emailDispatchFailed.
+        background.spawn_background(background.send_verification_email(
+            email, context, {"email": email},
+            cfg.MAIL_RETRY_ATTEMPTS, cfg.MAIL_RETRY_DELAY_SECONDS,
+        ))
 
-        # Update session counters
+        # Update session
         try:
-            request.session[session_key] = resend_count + 1
-            request.session[last_sent_key] = _to_iso(_now_utc())
-            sess = request.session.get("user_registration_data") or {}
+            sess = _registration_session(request)
             sess["otp"] = {"code": "******", "expiresAt": new_expiry, "isVerified": False}
             request.session["user_registration_data"] = sess
         except Exception:
             self.logger.exception("Failed to update session after resend for %s", email)
 
-        return responses.JsonResponse(content={"message": "A new OTP has been sent to your email."}, status=200)
+        return JsonResponse(content={"message": "A new OTP has been sent to your email."}, status=200)
 
     # ---------- Status (optional helper) ----------
     async def status(self, request: Request) -> responses.JsonResponse:
         """Return current email verification status for the session user or a provided email."""
-        try:
-            data = await request.json()
-        except Exception:
-            data = {}
-        email: Optional[str] = (data.get("email") if isinstance(data, dict) else None) or request.session.get("user_registration_data", {}).get("email")
+        data = await _read_payload(request)
+        if data is None:
+            return JsonResponse(content={"error": "Invalid JSON body."}, status=400)
+        email = _request_email(request, data)
         if not email:
-            return responses.JsonResponse(content={"error": "Email is required."}, status=400)
+            return JsonResponse(content={"error": "Email is required."}, status=400)
+        cached = _verified_cache_get(email)
+        if cached is not None:
+            return JsonResponse(content={"email": email, "isEmailVerified": True, "emailDispatchFailed": False, "otp": cached})
         try:
-            user = await connection.shallowuserregistration.find().where(email = email).execute()
+            user = await connection.find_user_by_email(email, _VERIFY_FIELDS)
         except Exception as exc:
             self.logger.exception("DB error while fetching user for status: %s", exc)
-            return responses.JsonResponse(content={"error": "Server error."}, status=500)
-        if not user.acknowledged:
-            return responses.JsonResponse(content={"error": "User not found."}, status=404)
-        user = user.raw_result[0] if isinstance(user.raw_result, list) else user.raw_result
-        otp = user.get("otp") or {}
+            return JsonResponse(content={"error": "Server error."}, status=500)
+        if user is None:
+            return JsonResponse(content={"error": "User not found."}, status=404)
+        otp = OtpState.from_raw(user.get("otp"))
         status_doc = user.get("status") or {}
-        return responses.JsonResponse(
+        email_verified = bool(status_doc.get("isEmailVerified"))
+        if email_verified:
+            _verified_cache_put(email, otp)
+        return JsonResponse(
             content={
                 "email": email,
-                "isEmailVerified": bool(status_doc.get("isEmailVerified")),
-                "otp": {
-                    "isVerified": bool(otp.get("isVerified")),
-                    "isExpired": bool(otp.get("isExpired")),
-                    "isUsed": bool(otp.get("isUsed")),
-                    "attempts": int(otp.get("count") or 0),
-                    "maxAttempts": int(otp.get("maxCount") or cfg.OTP_VERIFY_MAX_ATTEMPTS),
-                    "expiresAt": otp.get("expiresAt"),
-                },
+                "isEmailVerified": email_verified,
+                "emailDispatchFailed": bool(status_doc.get("emailDispatchFailed")),
+                "otp": otp.to_status(_attempts.pending(email, otp.code)),
             }
         )
 
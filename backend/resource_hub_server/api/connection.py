@@ -1,3 +1,5 @@
+from typing import Any, Dict, Optional, Sequence
+
 from axiomelectrus import Electrus
 
 client = Electrus()
@@ -11,4 +13,59 @@ usercollection = database["resource_hub_user_collection"]
 usercollectionlogs = database["resource_hub_user_collection_logs"]
 
 # user collection metadata
-usercollectionmetadata = database["resource_hub_user_collection_metadata"]
\ No newline at end of file
+usercollectionmetadata = database["resource_hub_user_collection_metadata"]
+
+# Electrus is embedded (JSON files, no sockets), so these module-level
+# handles already are the "pool": every request shares them and there is
+# no per-query connect/handshake to amortise. A pool of several handles on
+# the same file would only race on writes.
+_COLLECTIONS = (
+    shallowuserregistration,
+    usercollection,
+    usercollectionlogs,
+    usercollectionmetadata,
+)
+
+
+
+async def find_user_by_email(email: str, fields: Sequence[str] = ()) -> Optional[Dict[str, Any]]:
+    """The registration document for `email` (only `fields`, if given), or None.
+
+    The email lookup every auth handler does, in one place: builds the
+    query, runs it and unwraps Electrus' result. DB errors propagate.
+    """
+    query = shallowuserregistration.find()
+    if fields:
+        query = query.select(*fields)
+    result = await query.where(email = email).execute()
+    if not result.acknowledged:
+        return None
+    raw = result.raw_result
+    return raw[0] if isinstance(raw, list) else raw
+
+
+
+async def update_user_by_email(
+    email: str,
+    update: Dict[str, Any],
+    extra_filter: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Apply `update` to the user for `email` (and `extra_filter`) in one
+    conditional update; True if a document was modified.
+    """
+    result = await shallowuserregistration.update(
+        {"email": email, **(extra_filter or {})},
+        update,
+    )
+    return bool(getattr(result, "modified_count", 0))
+
+
+async def close() -> None:
+    """Shutdown hook (LIFESPAN_EVENTS): release the collection handles and the client."""
+    for collection in _COLLECTIONS:
+        try:
+            await collection.close()
+        except Exception:
+            # already closed / never connected
+            pass
+    client.close()
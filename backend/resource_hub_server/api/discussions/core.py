@@ -1,15 +1,21 @@
-from aquilify.wrappers import Request
-from aquilify.responses import JsonResponse as JSONResponse
+from aquilify.wrappers import Request, Response
 from aquilify.datastructure.core import UploadFile
 
 import os
 import time
 import math
+import heapq
+from collections import deque
+from operator import itemgetter
 
-from .helpers import _generate_id
+from .helpers import _avatar_url, _generate_id, _parse_tags, _refresh_trending, _save_upload, _toggle_like, fast_json_response
 from .helpers import _serialize_thread, _serialize_reply
 
-from .dummydata import _threads, _replies, BASE_ATTACH_DIR, now_ts
+from .dummydata import _threads, _replies, _threads_by_id, _replies_by_id, _unanswered_ids, BASE_ATTACH_DIR, now_ts
+from .dummydata import _by_course, _by_course_topic
+
+_by_trending = itemgetter("_trending_score")
+_FILE_FIELDS = ("attachment", "file")
 
 async def list_discussions(request: Request):
     """
@@ -25,42 +31,48 @@ async def list_discussions(request: Request):
     sort = params.get("sort", "recent")
     user_id = params.get("userId", "")  # optional for isLiked
 
-    # filter
-    items = []
-    for t in _threads:
-        ok = True
-        if q:
-            ok = q in t["title"].lower() or q in t["content"].lower()
-        if ok and course and course.lower() != "all":
-            ok = t["course"].lower() == course.lower()
-        if ok and topic:
-            ok = t["topic"].lower() == topic.lower()
-        if ok:
-            items.append(t)
-
-    # sort
-    if sort == "recent":
-        items.sort(key=lambda x: x.get("created_at", 0), reverse=True)
-    elif sort == "trending":
-        # very simple trending: likes + replies
-        items.sort(key=lambda x: (x.get("likes", 0) + x.get("replies_count", 0) * 0.5), reverse=True)
-    elif sort == "unanswered":
-        items = [it for it in items if it.get("replies_count", 0) == 0]
+    # filter: one short-circuiting comprehension over precomputed lowercase keys
+    course_lc = course.lower()
+    topic_lc = topic.lower()
+    if course_lc == "all":
+        course_lc = ""
+    # the course (and topic) match is implied by the bucket the scan starts from
+    if course_lc and topic_lc:
+        candidates = _by_course_topic.get((course_lc, topic_lc), ())
+    elif course_lc:
+        candidates = _by_course.get(course_lc, ())
+    else:
+        candidates = _threads
+    items = [
+        t for t in candidates
+        if (not q or q in t["_search_blob"])
+        and (not topic_lc or t["_topic_lc"] == topic_lc)
+    ]
+
+    if sort == "unanswered":
+        items = [it for it in items if it["id"] in _unanswered_ids]
 
     total = len(items)
     total_pages = max(1, math.ceil(total / page_size))
     start = (page - 1) * page_size
     end = start + page_size
+
+    # sort ("recent" needs none: _threads is kept newest-first and the filter preserves order)
+    if sort == "trending":
+        # partial selection of the top `end`, not a full sort; nlargest sorts
+        # outright when end >= total and keeps ties in their original order
+        items = heapq.nlargest(max(end, 0), items, key=_by_trending)
     page_items = items[start:end]
 
-    serialized = [_serialize_thread(t, user_id) for t in page_items]
-    return JSONResponse({"items": serialized, "meta": {"page": page, "pageSize": page_size, "total": total, "totalPages": total_pages}})
+    now = now_ts()
+    serialized = [_serialize_thread(t, user_id, now) for t in page_items]
+    return fast_json_response({"items": serialized, "meta": {"page": page, "pageSize": page_size, "total": total, "totalPages": total_pages}})
 
 async def create_discussion(request: Request):
     """
     POST /api/discussions (multipart/form-data)
     Fields: title, content, authorId, authorName, course, topic, tags (JSON string)
-    Optional: attachment file
+    Optional: attachment file (field "attachment", or "file" as the web client sends it)
     """
     form = await request.form()
     title = form.get("title", "").strip()
@@ -70,29 +82,23 @@ async def create_discussion(request: Request):
     course = form.get("course", "General")
     topic = form.get("topic", "Discussion")
     tags_raw = form.get("tags", "[]")
-    try:
-        tags = eval(tags_raw) if isinstance(tags_raw, str) else tags_raw
-    except Exception:
-        tags = []
+    tags = _parse_tags(tags_raw)
     attachment_path = None
 
-    # handle file
-    file_field = None
-    for k, v in form.multi_items():
-        if isinstance(v, UploadFile):
-            file_field = v
-            break
-    if isinstance(file_field, UploadFile):
+    # validate before any file I/O so rejected posts leave nothing on disk
+    if not title or not content:
+        return fast_json_response({"error": "title and content are required"}, status=400)
+
+    # handle file: keyed lookup of the expected fields, scan only for other keys
+    file_field = next((v for v in map(form.get, _FILE_FIELDS) if isinstance(v, UploadFile)), None)
+    if file_field is None:
+        file_field = next((v for _, v in form.multi_items() if isinstance(v, UploadFile)), None)
+    if file_field is not None:
         filename = f"{int(time.time())}_{file_field.filename}"
         save_path = os.path.join(BASE_ATTACH_DIR, filename)
-        with open(save_path, "wb") as f:
-            content_bytes = await file_field.read()
-            f.write(content_bytes)
+        await _save_upload(file_field, save_path)
         attachment_path = save_path
 
-    if not title or not content:
-        return JSONResponse({"error": "title and content are required"}, status=400)
-
     new_id = _generate_id("t")
     created_at = now_ts()
     thread = {
@@ -101,21 +107,28 @@ async def create_discussion(request: Request):
         "content": content,
         "author": authorName,
         "authorId": authorId,
-        "authorAvatar": f"https://api.dicebear.com/7.x/avataaars/svg?seed={authorName.replace(' ', '')}",
+        "authorAvatar": _avatar_url(authorName),
         "course": course,
         "topic": topic,
         "created_at": created_at,
-        "timestamp": "Just now",
         "likes": 0,
         "replies_count": 0,
         "isLikedBy": set(),
-        "tags": list(tags) if isinstance(tags, list) else [],
-        "attachment": attachment_path
+        "tags": tags,
+        "attachment": attachment_path,
+        "_search_blob": f"{title}\n{content}".lower(),
+        "_course_lc": course.lower(),
+        "_topic_lc": topic.lower(),
     }
     # prepend so it shows up on page 1 (recent)
-    _threads.insert(0, thread)
+    _threads.appendleft(thread)
+    _threads_by_id[new_id] = thread
+    _by_course.setdefault(thread["_course_lc"], deque()).appendleft(thread)
+    _by_course_topic.setdefault((thread["_course_lc"], thread["_topic_lc"]), deque()).appendleft(thread)
+    _unanswered_ids.add(new_id)
+    _refresh_trending(thread)
     # return created item
-    return JSONResponse({"item": _serialize_thread(thread)})
+    return fast_json_response({"item": _serialize_thread(thread)})
 
 async def create_reply(request: Request):
     """
@@ -129,10 +142,10 @@ async def create_reply(request: Request):
     authorName = data.get("authorName", "Anonymous")
 
     if not content:
-        return JSONResponse({"error": "content required"}, status=400)
-    thread = next((t for t in _threads if t["id"] == thread_id), None)
+        return fast_json_response({"error": "content required"}, status=400)
+    thread = _threads_by_id.get(thread_id)
     if not thread:
-        return JSONResponse({"error": "thread not found"}, status=404)
+        return fast_json_response({"error": "thread not found"}, status=404)
 
     rid = _generate_id("r")
     reply = {
@@ -141,15 +154,17 @@ async def create_reply(request: Request):
         "content": content,
         "author": authorName,
         "authorId": authorId,
-        "authorAvatar": f"https://api.dicebear.com/7.x/avataaars/svg?seed={authorName.replace(' ', '')}",
+        "authorAvatar": _avatar_url(authorName),
         "created_at": now_ts(),
-        "timestamp": "Just now",
         "likes": 0,
         "isLikedBy": set()
     }
     _replies.setdefault(thread_id, []).append(reply)
+    _replies_by_id.setdefault(thread_id, {})[rid] = reply
     thread["replies_count"] = thread.get("replies_count", 0) + 1
-    return JSONResponse({"item": _serialize_reply(reply)})
+    _unanswered_ids.discard(thread_id)
+    _refresh_trending(thread)
+    return fast_json_response({"item": _serialize_reply(reply)})
 
 async def like_thread(request: Request):
     """
@@ -161,20 +176,13 @@ async def like_thread(request: Request):
     data = await request.json()
     user_id = data.get("userId", "")
     if not user_id:
-        return JSONResponse({"error": "userId required"}, status=400)
-    thread = next((t for t in _threads if t["id"] == thread_id), None)
+        return fast_json_response({"error": "userId required"}, status=400)
+    thread = _threads_by_id.get(thread_id)
     if not thread:
-        return JSONResponse({"error": "thread not found"}, status=404)
-    is_liked = user_id in thread.get("isLikedBy", set())
-    if is_liked:
-        thread["isLikedBy"].remove(user_id)
-        thread["likes"] = max(0, thread.get("likes", 0) - 1)
-        is_liked = False
-    else:
-        thread.setdefault("isLikedBy", set()).add(user_id)
-        thread["likes"] = thread.get("likes", 0) + 1
-        is_liked = True
-    return JSONResponse({"likes": thread["likes"], "isLiked": is_liked})
+        return fast_json_response({"error": "thread not found"}, status=404)
+    is_liked = _toggle_like(thread, user_id)
+    _refresh_trending(thread)
+    return fast_json_response({"likes": thread["likes"], "isLiked": is_liked})
 
 async def like_reply(request: Request):
     """
@@ -186,28 +194,26 @@ async def like_reply(request: Request):
     data = await request.json()
     user_id = data.get("userId", "")
     if not user_id:
-        return JSONResponse({"error": "userId required"}, status=400)
-    replies = _replies.get(thread_id, [])
-    reply = next((r for r in replies if r["id"] == reply_id), None)
+        return fast_json_response({"error": "userId required"}, status=400)
+    reply = _replies_by_id.get(thread_id, {}).get(reply_id)
     if not reply:
-        return JSONResponse({"error": "reply not found"}, status=404)
-    if user_id in reply.get("isLikedBy", set()):
-        reply["isLikedBy"].remove(user_id)
-        reply["likes"] = max(0, reply.get("likes", 0) - 1)
-        is_liked = False
-    else:
-        reply.setdefault("isLikedBy", set()).add(user_id)
-        reply["likes"] = reply.get("likes", 0) + 1
-        is_liked = True
-    return JSONResponse({"likes": reply["likes"], "isLiked": is_liked})
+        return fast_json_response({"error": "reply not found"}, status=404)
+    is_liked = _toggle_like(reply, user_id)
+    return fast_json_response({"likes": reply["likes"], "isLiked": is_liked})
 
 async def get_thread_replies(request: Request):
     thread_id = request.path_params["thread_id"]
     user_id = request.query_params.get("userId", "")
-    replies = _replies.get(thread_id, [])
-    serialized = [_serialize_reply(r, user_id) for r in replies]
-    return JSONResponse({"items": serialized})
+    now = now_ts()
+    serialized = [_serialize_reply(r, user_id, now) for r in _replies.get(thread_id, ())]
+    return fast_json_response({"items": serialized})
+
+# small health check: fixed-shape body, rebuilt at most once a second
+_PING_PREFIX = b'{"ok":true,"now":'
+_ping_body = [0, b""]  # [second, body]
 
-# small health check
 async def ping(request: Request):
-    return JSONResponse({"ok": True, "now": now_ts()})
\ No newline at end of file
+    now = now_ts()
+    if _ping_body[0] != now:
+        _ping_body[:] = [now, b"%s%d}" % (_PING_PREFIX, now)]
+    return Response(_ping_body[1], content_type="application/json")
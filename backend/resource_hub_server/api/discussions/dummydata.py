@@ -1,6 +1,7 @@
 import time
 import os
-from typing import Dict, List, Any
+from collections import deque
+from typing import Deque, Dict, List, Any, Set, Tuple
 
 BASE_ATTACH_DIR = "/tmp/community_attachments"
 os.makedirs(BASE_ATTACH_DIR, exist_ok=True)
@@ -11,16 +12,18 @@ os.makedirs(BASE_ATTACH_DIR, exist_ok=True)
 def now_ts():
     return int(time.time())
 
+# (upper bound, unit seconds, label); the last row catches everything older
+_TS_TABLE = ((3600, 60, "minutes"), (86400, 3600, "hours"), (None, 86400, "days"))
+
 def friendly_ts(seconds_ago: int):
     if seconds_ago < 60:
-        return f"{seconds_ago} seconds ago"
-    if seconds_ago < 3600:
-        return f"{seconds_ago // 60} minutes ago"
-    if seconds_ago < 86400:
-        return f"{seconds_ago // 3600} hours ago"
-    return f"{seconds_ago // 86400} days ago"
+        return "Just now"
+    for limit, unit, label in _TS_TABLE:
+        if limit is None or seconds_ago < limit:
+            return f"{seconds_ago // unit} {label} ago"
 
-_threads: List[Dict[str, Any]] = [
+# newest-first; a deque so create_discussion prepends in O(1)
+_threads: Deque[Dict[str, Any]] = deque([
     {
         "id": "1",
         "title": "Best resources for Data Structures and Algorithms?",
@@ -31,7 +34,6 @@ _threads: List[Dict[str, Any]] = [
         "course": "Computer Science",
         "topic": "Data Structures",
         "created_at": now_ts() - 7200,
-        "timestamp": friendly_ts(7200),
         "likes": 24,
         "replies_count": 2,
         "isLikedBy": set(),  # set of userIds
@@ -48,7 +50,6 @@ _threads: List[Dict[str, Any]] = [
         "course": "Physics",
         "topic": "Study Materials",
         "created_at": now_ts() - 18000,
-        "timestamp": friendly_ts(18000),
         "likes": 45,
         "replies_count": 1,
         "isLikedBy": set(["3"]),
@@ -65,14 +66,13 @@ _threads: List[Dict[str, Any]] = [
         "course": "Engineering",
         "topic": "Study Groups",
         "created_at": now_ts() - 86400,
-        "timestamp": friendly_ts(86400),
         "likes": 18,
         "replies_count": 0,
         "isLikedBy": set(),
         "tags": ["Study Group", "Exams", "Collaboration"],
         "attachment": None
     }
-]
+])
 
 _replies: Dict[str, List[Dict[str, Any]]] = {
     "1": [
@@ -84,7 +84,6 @@ _replies: Dict[str, List[Dict[str, Any]]] = {
             "authorId": "4",
             "authorAvatar": "https://api.dicebear.com/7.x/avataaars/svg?seed=sarah",
             "created_at": now_ts() - 3600,
-            "timestamp": friendly_ts(3600),
             "likes": 8,
             "isLikedBy": set()
         },
@@ -96,7 +95,6 @@ _replies: Dict[str, List[Dict[str, Any]]] = {
             "authorId": "5",
             "authorAvatar": "https://api.dicebear.com/7.x/avataaars/svg?seed=mike",
             "created_at": now_ts() - 1800,
-            "timestamp": friendly_ts(1800),
             "likes": 12,
             "isLikedBy": set(["1"])
         }
@@ -110,9 +108,32 @@ _replies: Dict[str, List[Dict[str, Any]]] = {
             "authorId": "6",
             "authorAvatar": "https://api.dicebear.com/7.x/avataaars/svg?seed=studentb",
             "created_at": now_ts() - 7200,
-            "timestamp": friendly_ts(7200),
             "likes": 2,
             "isLikedBy": set()
         }
     ]
 }
+
+# id -> record indexes over the same dicts, so lookups are a single probe
+_threads_by_id: Dict[str, Dict[str, Any]] = {t["id"]: t for t in _threads}
+_unanswered_ids: Set[str] = {t["id"] for t in _threads if t["replies_count"] == 0}
+_replies_by_id: Dict[str, Dict[str, Dict[str, Any]]] = {
+    tid: {r["id"]: r for r in replies} for tid, replies in _replies.items()
+}
+
+# derived fields: the trending order key (refreshed when likes/replies change)
+# and the lowercased text/course/topic the list filters compare against
+for _t in _threads:
+    _t["_trending_score"] = _t["likes"] + _t["replies_count"] * 0.5
+    _t["_search_blob"] = f"{_t['title']}\n{_t['content']}".lower()
+    _t["_course_lc"] = _t["course"].lower()
+    _t["_topic_lc"] = _t["topic"].lower()
+
+# newest-first buckets per lowercased course and (course, topic), holding the
+# same dicts as _threads, so dropdown-filtered lists scan only their bucket
+_by_course: Dict[str, Deque[Dict[str, Any]]] = {}
+_by_course_topic: Dict[Tuple[str, str], Deque[Dict[str, Any]]] = {}
+for _t in _threads:
+    _by_course.setdefault(_t["_course_lc"], deque()).append(_t)
+    _by_course_topic.setdefault((_t["_course_lc"], _t["_topic_lc"]), deque()).append(_t)
+del _t
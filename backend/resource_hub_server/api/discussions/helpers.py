@@ -1,22 +1,105 @@
-import uuid
-from typing import Dict, Any
+import asyncio
+import itertools
+import shutil
+import time
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+
+from aquilify.datastructure.core import UploadFile
+
+from ..auth.utils.jsonresponse import JsonResponse, loads
+from .dummydata import friendly_ts, now_ts
+
+# process start time + a counter: unique and insertion-ordered within the
+# in-memory store, with no RNG call per id
+_ID_EPOCH = f"{int(time.time()):08x}"
+_id_counter = itertools.count()
 
 def _generate_id(prefix="t"):
-    return f"{prefix}-{uuid.uuid4().hex[:8]}"
+    return f"{prefix}-{_ID_EPOCH}{next(_id_counter):04x}"
+
+_COPY_CHUNK = 64 * 1024
+
+def _copy_to_path(source, path: str) -> None:
+    with open(path, "wb") as f:
+        shutil.copyfileobj(source, f, _COPY_CHUNK)
+
+async def _save_upload(upload: UploadFile, path: str) -> None:
+    """Copy an upload to `path` in 64 KiB chunks instead of buffering it whole."""
+    source = getattr(upload, "file", None)
+    if callable(getattr(source, "read", None)):
+        # spooled upload: one worker-thread call copies straight from the spool file
+        await upload.seek(0)
+        await asyncio.to_thread(_copy_to_path, source, path)
+        return
+    with open(path, "wb") as f:
+        while chunk := await upload.read(_COPY_CHUNK):
+            await asyncio.to_thread(f.write, chunk)
+
+_SEED_STRIP = str.maketrans("", "", " ")
+
+@lru_cache(maxsize=4096)
+def _avatar_url(name: str) -> str:
+    return f"https://api.dicebear.com/7.x/avataaars/svg?seed={name.translate(_SEED_STRIP)}"
+
+def fast_json_response(payload: Dict[str, Any], status: int = 200) -> JsonResponse:
+    """JSON response encoded in one step to bytes (orjson when installed)."""
+    return JsonResponse(payload, status=status)
+
+def _refresh_trending(thread: Dict[str, Any]) -> None:
+    # very simple trending: likes + replies
+    thread["_trending_score"] = thread.get("likes", 0) + thread.get("replies_count", 0) * 0.5
+
+def _toggle_like(record: Dict[str, Any], user_id: str) -> bool:
+    """Flip `user_id`'s like on a thread or reply; returns the new state.
+
+    Every record is created with an isLikedBy set, and likes only drops for
+    a user in that set, so the count can't go negative.
+    """
+    liked_by = record["isLikedBy"]
+    was_liked = user_id in liked_by
+    if was_liked:
+        liked_by.discard(user_id)
+    else:
+        liked_by.add(user_id)
+    record["likes"] += -1 if was_liked else 1
+    return not was_liked
+
+def _parse_tags(raw) -> List[str]:
+    """Tags from the form field: a JSON array of strings, anything else is []."""
+    if isinstance(raw, str):
+        try:
+            raw = loads(raw)
+        except ValueError:
+            return []
+    if not isinstance(raw, list):
+        return []
+    return [tag for tag in raw if isinstance(tag, str)]
+
+# per-request fields, overlaid on the cached public view on every serialize
+_THREAD_LIVE = ("likes", "replies_count", "isLikedBy", "created_at")
+_REPLY_LIVE = ("likes", "isLikedBy", "created_at")
+
+def _public_view(record: Dict[str, Any], live) -> Dict[str, Any]:
+    """The record minus live and internal ("_"-prefixed) fields, built once and kept on it."""
+    public = record.get("_public")
+    if public is None:
+        public = {k: v for k, v in record.items() if k not in live and not k.startswith("_")}
+        record["_public"] = public
+    return public
 
-def _serialize_thread(thread: Dict[str, Any], user_id: str = ""):
-    t = dict(thread)
+def _serialize_thread(thread: Dict[str, Any], user_id: str = "", now: Optional[int] = None):
+    """`now` lets a caller serializing many records read the clock once."""
+    t = _public_view(thread, _THREAD_LIVE).copy()
+    t["timestamp"] = friendly_ts((now_ts() if now is None else now) - thread["created_at"])
     t["likes"] = thread.get("likes", 0)
-    t["replies"] = thread.get("replies_count", 0)
-    t["isLiked"] = user_id in thread.get("isLikedBy", set())
-    # remove internal 'isLikedBy' and 'created_at'
-    t.pop("isLikedBy", None)
-    t.pop("created_at", None)
+    t["replies_count"] = t["replies"] = thread.get("replies_count", 0)
+    t["isLiked"] = user_id in thread.get("isLikedBy", ())
     return t
 
-def _serialize_reply(reply: Dict[str, Any], user_id: str = ""):
-    r = dict(reply)
-    r["isLiked"] = user_id in reply.get("isLikedBy", set())
-    r.pop("isLikedBy", None)
-    r.pop("created_at", None)
+def _serialize_reply(reply: Dict[str, Any], user_id: str = "", now: Optional[int] = None):
+    r = _public_view(reply, _REPLY_LIVE).copy()
+    r["timestamp"] = friendly_ts((now_ts() if now is None else now) - reply["created_at"])
+    r["likes"] = reply.get("likes", 0)
+    r["isLiked"] = user_id in reply.get("isLikedBy", ())
     return r
@@ -200,7 +200,10 @@ SECRET_KEY_FALLBACKS = []
 
 # LIFESPAN Handling...
 
-LIFESPAN_EVENTS = [ ]
+LIFESPAN_EVENTS = [
+    { "origin": "api.auth.verify.emailverification.flush_pending_attempts", "event": "shutdown" },
+    { "origin": "api.connection.close", "event": "shutdown" },
+]
 
 # GzipMiddleware Configuration
 
@@ -0,0 +1,104 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from axiomelectrus import Electrus
+
+from ..api import connection
+from ..api.auth.verify import emailverification
+
+
+class _Request:
+    def __init__(self):
+        self.session = {}
+
+
+class EmailVerificationTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        # Collection paths always resolve under ~/.electrus, whatever base_path says
+        with mock.patch.dict(os.environ, {"HOME": self.tmp}):
+            self.collection = Electrus()["test_db"]["registrations"]
+        patcher = mock.patch.object(connection, "shallowuserregistration", self.collection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_fresh_otp_verifies_on_first_attempt(self):
+        email = "fresh@example.com"
+        await self.collection.insertOne({
+            "email": email,
+            "otp": {
+                "code": "123456",
+                "expiresAt": int(time.time()) + 600,
+                "isVerified": False,
+                "isUsed": False,
+                "isExpired": False,
+                "isResendAllowed": True,
+                "count": 0,
+                "maxCount": 5,
+            },
+            "timestamps": {"createdAt": None, "updatedAt": None},
+            "status": {"isEmailVerified": False},
+        })
+
+        # the conditional update alone must match; the read path is the fallback
+        with mock.patch.object(connection, "find_user_by_email", side_effect=AssertionError("slow path taken")):
+            response = await emailverification.EmailVerification()._verify_user(_Request(), email, "123456")
+
+        self.assertEqual(response.status_code, 200)
+        doc = await connection.find_user_by_email(email, ("otp", "status"))
+        self.assertTrue(doc["status"]["isEmailVerified"])
+        self.assertTrue(doc["otp"]["isUsed"])
+
+
+    async def test_flushed_attempts_skip_a_replaced_otp(self):
+        email = "resent@example.com"
+        await self.collection.insertOne({
+            "email": email,
+            "otp": {"code": "111111", "count": 0, "maxCount": 5},
+            "timestamps": {"updatedAt": None},
+        })
+        flusher = emailverification._AttemptFlusher(interval=60, max_emails=100)
+        flusher.submit(email, "111111")
+        flusher.submit(email, "111111")
+        self.assertEqual(flusher.pending(email, "111111"), 2)
+
+        # a resend swaps in a new OTP before the batch is written
+        await self.collection.update({"email": email}, {"$set": {"otp.code": "222222", "otp.count": 0}})
+        await flusher.flush()
+
+        doc = await connection.find_user_by_email(email, ("otp",))
+        self.assertEqual(doc["otp"]["count"], 0)
+        self.assertEqual(flusher.pending(email, "111111"), 0)
+
+    async def test_attempts_land_on_the_current_otp(self):
+        email = "retry@example.com"
+        await self.collection.insertOne({
+            "email": email,
+            "otp": {"code": "111111", "count": 1, "maxCount": 5},
+            "timestamps": {"updatedAt": None},
+        })
+        flusher = emailverification._AttemptFlusher(interval=60, max_emails=100)
+        flusher.submit(email, "111111")
+        flusher.submit(email, "111111")
+        await flusher.flush()
+
+        doc = await connection.find_user_by_email(email, ("otp",))
+        self.assertEqual(doc["otp"]["count"], 3)
+
+    def test_discard_drops_in_flight_attempts(self):
+        flusher = emailverification._AttemptFlusher(interval=60, max_emails=100)
+        flusher._inflight[("a@example.com", "111111")] = 3
+        flusher._pending[("a@example.com", "111111")] = 1
+        flusher._pending[("b@example.com", "333333")] = 1
+        flusher.discard("a@example.com")
+        self.assertEqual(flusher.pending("a@example.com", "111111"), 0)
+        self.assertEqual(flusher.pending("b@example.com", "333333"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+from ..api.auth.utils.ratelimit import TokenBucketLimiter
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class TokenBucketLimiterTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = _Clock()
+
+    def limiter(self, capacity, refill_seconds, max_keys=100_000):
+        return TokenBucketLimiter(capacity, refill_seconds, max_keys, clock=self.clock)
+
+    def test_burst_then_refused(self):
+        limiter = self.limiter(3, 30)
+        self.assertEqual([limiter.hit("a") for _ in range(3)], [0, 0, 0])
+        self.assertEqual(limiter.hit("a"), 30)
+
+    def test_keys_are_independent(self):
+        limiter = self.limiter(1, 30)
+        self.assertEqual(limiter.hit("a"), 0)
+        self.assertEqual(limiter.hit("b"), 0)
+        self.assertEqual(limiter.hit("a"), 30)
+
+    def test_refill(self):
+        limiter = self.limiter(2, 10)
+        limiter.hit("a")
+        limiter.hit("a")
+        self.clock.advance(9.5)
+        self.assertEqual(limiter.hit("a"), 1)
+        self.clock.advance(0.5)
+        self.assertEqual(limiter.hit("a"), 0)
+        # refills never exceed the burst capacity
+        self.clock.advance(1000)
+        self.assertEqual([limiter.hit("a") for _ in range(3)], [0, 0, 10])
+
+    def test_retry_after_counts_down_and_rounds_up(self):
+        limiter = self.limiter(1, 30)
+        limiter.hit("a")
+        self.assertEqual(limiter.hit("a"), 30)
+        self.clock.advance(12.2)
+        self.assertEqual(limiter.hit("a"), 18)
+        self.clock.advance(17.9)
+        self.assertEqual(limiter.hit("a"), 0)
+
+    def test_wait_does_not_take_a_token(self):
+        limiter = self.limiter(1, 30)
+        self.assertEqual(limiter.wait("a"), 0)
+        self.assertEqual(limiter.wait("a"), 0)
+        self.assertEqual(limiter.hit("a"), 0)
+        self.assertEqual(limiter.wait("a"), 30)
+        self.clock.advance(10)
+        self.assertEqual(limiter.wait("a"), 20)
+        self.assertEqual(limiter.hit("a"), 20)
+
+    def test_least_recently_used_key_is_evicted(self):
+        limiter = self.limiter(1, 30, max_keys=2)
+        limiter.hit("a")
+        limiter.hit("b")
+        limiter.hit("a")  # refused, but refreshes "a"
+        limiter.hit("c")  # evicts "b"
+        self.assertEqual(limiter.hit("b"), 0)  # a dropped key starts full; evicts "a"
+        self.assertEqual(limiter.hit("a"), 0)  # evicts "c"
+        self.assertEqual(limiter.hit("b"), 30)  # still tracked
+
+
+if __name__ == "__main__":
+    unittest.main()
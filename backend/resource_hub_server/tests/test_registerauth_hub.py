@@ -0,0 +1,68 @@
+import dataclasses
+import io
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from ..api import exception
+from ..api.auth import registerauth_hub
+
+
+class _Upload:
+    """The parts of aquilify's UploadFile that _stream_save uses."""
+
+    def __init__(self, data: bytes, filename: str = "avatar.png"):
+        self.filename = filename
+        self.content_type = "image/png"
+        self.size = len(data)
+        self.file = io.BytesIO(data)
+
+    async def read(self, n: int = -1) -> bytes:
+        return self.file.read(n)
+
+    async def close(self) -> None:
+        self.file.close()
+
+
+class _Magic:
+    def __init__(self, mime: str):
+        self.mime = mime
+
+    def from_buffer(self, head: bytes) -> str:
+        return self.mime
+
+
+class StreamSaveValidationTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.upload_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.upload_dir, ignore_errors=True)
+        self.hub = registerauth_hub.RegisterAuthHub()
+        self.hub.cfg = dataclasses.replace(registerauth_hub.cfg, UPLOAD_DIR=self.upload_dir)
+
+    async def assertRejected(self, upload: _Upload) -> None:
+        with self.assertRaises(exception.BaseApiException) as ctx:
+            await self.hub._stream_save(upload)
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.assertEqual(ctx.exception.message, "Uploaded file is not a valid image.")
+        # rejected before anything was written
+        self.assertEqual(list(self.upload_dir.iterdir()), [])
+
+    async def test_empty_upload_is_rejected(self):
+        await self.assertRejected(_Upload(b""))
+
+    async def test_non_image_upload_is_rejected(self):
+        with mock.patch.object(registerauth_hub, "_MAGIC", _Magic("application/pdf")):
+            await self.assertRejected(_Upload(b"%PDF-1.7\n" + b"\0" * 64))
+
+    async def test_png_upload_is_saved(self):
+        data = b"\x89PNG\r\n\x1a\n" + b"\0" * 64
+        with mock.patch.object(registerauth_hub, "Image", None):
+            meta = await self.hub._stream_save(_Upload(data))
+        self.assertEqual(meta["size"], len(data))
+        self.assertEqual(Path(meta["path"]).read_bytes(), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
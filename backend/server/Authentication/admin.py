@@ -1,13 +1,19 @@
 # users/admin.py
 import csv
-import io
-from typing import Any
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from operator import attrgetter
+from smtplib import SMTPException
+from typing import Any, List
 from django.contrib import admin, messages
-from django.contrib.admin import SimpleListFilter
 from django.contrib.admin.utils import unquote
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import AdminPasswordChangeForm, PasswordResetForm
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+from django.db import connection
+from django.http import HttpRequest, HttpResponseRedirect, StreamingHttpResponse
 from django.urls import path, reverse
 from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
@@ -18,6 +24,117 @@ from django.utils.encoding import force_str  # converts UUID to string
 
 from .models import User as ApiUser, Profile, ProfilePic, OTP
 
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------
+# CSV streaming
+# ---------------------------
+CSV_EXPORT_CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """Pseudo-buffer for csv.writer: write() hands the formatted line straight back."""
+    def write(self, value):
+        return value
+
+
+def _stream_csv(header, rows, filename: str) -> StreamingHttpResponse:
+    """Stream `header` and then each row as CSV, so memory stays bounded by one DB chunk."""
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+# ---------------------------
+# Badges
+# ---------------------------
+_BADGE_STYLE = {
+    "green": "color:green; font-weight:bold;",
+    "red": "color:red; font-weight:bold;",
+    "orange": "color:orange; font-weight:bold;",
+    "year": "font-weight:bold; color:#007bff;",
+}
+
+
+@lru_cache(maxsize=256)
+def _badge(style: str, text: str):
+    """Escaped badge <span>, built once per (style, translated text) pair.
+
+    Callers pass the label already rendered with str(), so the cache key follows
+    the active language and lazy translations stay correct.
+    """
+    return format_html('<span style="{}">{}</span>', _BADGE_STYLE[style], text)
+
+
+@lru_cache(maxsize=1024)
+def _thumbnail(name: str):
+    """Changelist thumbnail for a stored profile picture, keyed by its file name.
+
+    Storage here is the local FileSystemStorage, whose url() depends only on the
+    name. A signed-URL backend would need a TTL instead of this cache.
+    """
+    url = ProfilePic._meta.get_field("file").storage.url(name)
+    return format_html(
+        '<a href="{0}" target="_blank">'
+        '<img src="{0}" style="max-height:40px; max-width:40px; object-fit:cover; border-radius:4px; border:1px solid #ccc;" />'
+        "</a>",
+        url,
+    )
+
+
+# ---------------------------
+# Background password reset mail
+# ---------------------------
+PASSWORD_RESET_TEMPLATE = "registration/password_reset_email.html"
+PASSWORD_RESET_SEND_ATTEMPTS = 3
+
+# admin actions hand SMTP work to this pool and return immediately
+_mail_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="admin-mail")
+
+
+def _send_password_resets(emails: List[str], use_https: bool, domain: str) -> None:
+    """Send a reset email to each address, retrying SMTP failures with backoff.
+
+    `domain` is the admin request's host; without django.contrib.sites that is
+    exactly what PasswordResetForm.save(request=...) would have used.
+    """
+    try:
+        form = PasswordResetForm()
+        for email in emails:
+            # addresses come straight from the DB, so skip re-validating them;
+            # save() only reads cleaned_data["email"]
+            form.cleaned_data = {"email": email}
+            for attempt in range(1, PASSWORD_RESET_SEND_ATTEMPTS + 1):
+                try:
+                    form.save(domain_override=domain, use_https=use_https, email_template_name=PASSWORD_RESET_TEMPLATE)
+                    break
+                except (SMTPException, OSError):  # OSError: refused connection, socket timeout
+                    if attempt == PASSWORD_RESET_SEND_ATTEMPTS:
+                        logger.exception("Password reset email to %s failed", email)
+                    else:
+                        time.sleep(2 ** attempt)
+                except Exception:
+                    # not worth retrying, but the other addresses still get theirs
+                    logger.exception("Password reset email to %s failed", email)
+                    break
+    finally:
+        # worker threads keep their own DB connection; don't leave it open
+        connection.close()
+
+
+def _log_mail_failure(future: Future) -> None:
+    # nobody waits on the future, so surface anything that escaped the batch
+    if not future.cancelled() and future.exception() is not None:
+        logger.error("Password reset batch failed", exc_info=future.exception())
+
 
 # ---------------------------
 # Forms
@@ -130,29 +247,24 @@ class ProfilePicInline(admin.StackedInline):
 
 
 # ---------------------------
-# Filters
+# ApiUser Admin
 # ---------------------------
-class EmailVerifiedFilter(SimpleListFilter):
-    title = _("email verified")
-    parameter_name = "is_email_verified"
-
-    def lookups(self, request, model_admin):
-        return (
-            ("1", _("Verified")),
-            ("0", _("Not verified")),
-        )
+class ApiUserChangeList(ChangeList):
+    """Changelist that loads only the columns list_display/list_editable read.
+
+    The joined profile rows keep just their back-pointer to the user (so Django
+    can stitch them onto each row); profile_pic also keeps `file` for the thumbnail.
+    """
+    list_columns = (
+        "email", "first_name", "last_name", "phone", "year", "dob",
+        "is_active", "is_email_verified", "last_login", "created_at",
+        "profile__user", "profile_pic__user", "profile_pic__file",
+    )
 
-    def queryset(self, request, queryset):
-        if self.value() == "1":
-            return queryset.filter(is_email_verified=True)
-        if self.value() == "0":
-            return queryset.filter(is_email_verified=False)
-        return queryset
+    def get_queryset(self, request, *args, **kwargs):
+        return super().get_queryset(request, *args, **kwargs).only(*self.list_columns)
 
 
-# ---------------------------
-# ApiUser Admin
-# ---------------------------
 @admin.register(ApiUser)
 class ApiUserAdmin(admin.ModelAdmin):
     form = ApiUserChangeForm
@@ -171,7 +283,7 @@ class ApiUserAdmin(admin.ModelAdmin):
         "profile_thumbnail",
         "created_at",
     )
-    list_filter = ("is_active", EmailVerifiedFilter, "year", "created_at")
+    list_filter = ("is_active", ("is_email_verified", admin.BooleanFieldListFilter), "year", "created_at")
     search_fields = ("email", "first_name", "last_name", "phone")
     ordering = ("-created_at",)
     readonly_fields = ("created_at", "updated_at", "last_login", "age_display", "full_name")
@@ -201,22 +313,32 @@ class ApiUserAdmin(admin.ModelAdmin):
     # ---------------------------
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        # select related where we can
+        # select related where we can; the changelist narrows the columns
+        # (ApiUserChangeList), change/detail views still load full rows
         return qs.select_related("profile", "profile_pic")
 
+    def get_changelist(self, request, **kwargs):
+        return ApiUserChangeList
+
     # ---------------------------
     # List / computed helpers
     # ---------------------------
+    _change_url_parts = None  # (prefix, suffix) around the pk, reversed once
+
     @admin.display(description="Email", ordering="email")
     def email_link(self, obj):
         """
         Build admin change URL dynamically (works regardless of app_label/model_name)
         and ensure the PK is converted to string (handles UUID PKs).
+        The URL is reversed once with a placeholder pk; rows only splice in theirs.
         """
-        app_label = obj._meta.app_label
-        model_name = obj._meta.model_name
-        url = reverse(f"admin:{app_label}_{model_name}_change", args=(force_str(obj.pk),))
-        return format_html('<a href="{}">{}</a>', url, obj.email)
+        if self._change_url_parts is None:
+            opts = self.model._meta
+            url = reverse(f"admin:{opts.app_label}_{opts.model_name}_change", args=("__pk__",))
+            prefix, _sep, suffix = url.partition("__pk__")
+            self._change_url_parts = (prefix, suffix)
+        prefix, suffix = self._change_url_parts
+        return format_html('<a href="{}">{}</a>', f"{prefix}{force_str(obj.pk)}{suffix}", obj.email)
 
     email_link.short_description = "Email"
     email_link.admin_order_field = "email"
@@ -243,44 +365,40 @@ class ApiUserAdmin(admin.ModelAdmin):
     def profile_thumbnail(self, obj: ApiUser):
         pic = getattr(obj, "profile_pic", None)
         if pic and getattr(pic, "file", None):
-            url = pic.file.url
-            return format_html(
-                '<a href="{0}" target="_blank">'
-                '<img src="{0}" style="max-height:40px; max-width:40px; object-fit:cover; border-radius:4px; border:1px solid #ccc;" />'
-                "</a>",
-                url,
-            )
+            return _thumbnail(pic.file.name)
         return "-"
 
     @admin.display(description=_("Status"), ordering="is_active")
     def status_badge(self, obj: ApiUser):
-        color = "green" if obj.is_active else "red"
-        label = _("Active") if obj.is_active else _("Inactive")
-        return format_html('<span style="color:{}; font-weight:bold;">{}</span>', color, label)
+        if obj.is_active:
+            return _badge("green", str(_("Active")))
+        return _badge("red", str(_("Inactive")))
 
     @admin.display(description=_("Email Verified"), ordering="is_email_verified")
     def email_verified_badge(self, obj: ApiUser):
-        color = "green" if obj.is_email_verified else "orange"
-        label = _("Verified") if obj.is_email_verified else _("Pending")
-        return format_html('<span style="color:{}; font-weight:bold;">{}</span>', color, label)
+        if obj.is_email_verified:
+            return _badge("green", str(_("Verified")))
+        return _badge("orange", str(_("Pending")))
 
     @admin.display(description=_("Year"))
     def year_badge(self, obj: ApiUser):
         if obj.year:
-            return format_html('<span style="font-weight:bold; color:#007bff;">{} {}</span>', _("Year"), obj.year)
+            return _badge("year", f"{_('Year')} {obj.year}")
         return "-"
 
     # ---------------------------
     # Actions
     # ---------------------------
-    @admin.action(description=_("Deactivate selected users"))
+    # Bulk flag actions: a single UPDATE that skips rows already in the target
+    # state, so the count reflects real changes and unchanged rows aren't rewritten.
+    @admin.action(description=_("Deactivate selected users"), permissions=["change"])
     def deactivate_selected(self, request: HttpRequest, queryset):
-        updated = queryset.update(is_active=False)
+        updated = queryset.filter(is_active=True).update(is_active=False)
         self.message_user(request, _("%d user(s) deactivated.") % updated, messages.SUCCESS)
 
-    @admin.action(description=_("Activate selected users"))
+    @admin.action(description=_("Activate selected users"), permissions=["change"])
     def activate_selected(self, request: HttpRequest, queryset):
-        updated = queryset.update(is_active=True)
+        updated = queryset.filter(is_active=False).update(is_active=True)
         self.message_user(request, _("%d user(s) activated.") % updated, messages.SUCCESS)
 
     @admin.action(description=_("Export selected users (CSV)"))
@@ -290,27 +408,19 @@ class ApiUserAdmin(admin.ModelAdmin):
             self.message_user(request, _("You do not have permission to export users."), level=messages.ERROR)
             return
 
-        meta = self.model._meta
         field_names = ["id", "email", "first_name", "last_name", "phone", "university", "course", "year", "dob", "is_active", "is_email_verified", "created_at"]
-
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
-        writer.writerow(field_names)
-        for obj in queryset:
-            writer.writerow([getattr(obj, f) for f in field_names])
-
-        response = HttpResponse(buffer.getvalue(), content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="users_export.csv"'
-        return response
+        users = queryset.select_related(None).only(*field_names).iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE)
+        rows = map(attrgetter(*field_names), users)
+        return _stream_csv(field_names, rows, "users_export.csv")
 
     @admin.action(description=_("Export selected emails"))
     def export_selected_emails(self, request: HttpRequest, queryset):
         emails = list(queryset.values_list("email", flat=True))
         self.message_user(request, ", ".join(emails))
 
-    @admin.action(description=_("Mark selected users as email verified"))
+    @admin.action(description=_("Mark selected users as email verified"), permissions=["change"])
     def mark_emails_verified(self, request: HttpRequest, queryset):
-        updated = queryset.update(is_email_verified=True)
+        updated = queryset.filter(is_email_verified=False).update(is_email_verified=True)
         self.message_user(request, _("%d user(s) marked as verified.") % updated, messages.SUCCESS)
 
     @admin.action(description=_("Send password reset email to selected users"))
@@ -319,14 +429,11 @@ class ApiUserAdmin(admin.ModelAdmin):
             self.message_user(request, _("You don't have permission to send password reset emails."), level=messages.ERROR)
             return
 
-        sent = 0
-        for user in queryset:
-            # Use Django's PasswordResetForm to send the email via configured EMAIL_BACKEND
-            form = PasswordResetForm({"email": user.email})
-            if form.is_valid():
-                form.save(request=request, use_https=request.is_secure(), email_template_name="registration/password_reset_email.html")
-                sent += 1
-        self.message_user(request, _("%d password reset email(s) sent.") % sent, messages.SUCCESS)
+        # Django's PasswordResetForm sends via the configured EMAIL_BACKEND, off the request thread
+        emails = list(queryset.filter(is_active=True).values_list("email", flat=True))
+        future = _mail_executor.submit(_send_password_resets, emails, request.is_secure(), request.get_host())
+        future.add_done_callback(_log_mail_failure)
+        self.message_user(request, _("%d password reset email(s) queued.") % len(emails), messages.SUCCESS)
 
     # ---------------------------
     # Custom admin urls (password change)
@@ -385,15 +492,14 @@ class ApiUserAdmin(admin.ModelAdmin):
     # Hook into change view to show quick links
     # ---------------------------
     def change_view(self, request, object_id, form_url="", extra_context=None):
+        # both links depend only on object_id; the base view loads (or 404s) the object itself
         extra_context = extra_context or {}
-        obj = self.get_object(request, unquote(object_id))
-        if obj:
-            extra_context.update(
-                {
-                    "password_change_url": reverse("admin:users_apiuser_set_password", args=(object_id,)),
-                    "send_reset_url": reverse("admin:users_apiuser_changelist"),
-                }
-            )
+        extra_context.update(
+            {
+                "password_change_url": reverse("admin:users_apiuser_set_password", args=(object_id,)),
+                "send_reset_url": reverse("admin:users_apiuser_changelist"),
+            }
+        )
         return super().change_view(request, object_id, form_url, extra_context)
 
     # ---------------------------
@@ -425,6 +531,7 @@ class ApiUserAdmin(admin.ModelAdmin):
 @admin.register(Profile)
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "updated_via", "created_at", "updated_at")
+    list_select_related = ("user",)
     search_fields = ("user__email", "user__first_name", "user__last_name")
     readonly_fields = ("created_at", "updated_at")
 
@@ -435,6 +542,7 @@ class ProfileAdmin(admin.ModelAdmin):
 @admin.register(ProfilePic)
 class ProfilePicAdmin(admin.ModelAdmin):
     list_display = ("user", "original_filename", "size", "uploaded_at", "preview")
+    list_select_related = ("user",)
     search_fields = ("user__email", "original_filename")
     readonly_fields = ("size", "uploaded_at")
     fields = ("user", "file", "original_filename", "mime_type", "size", "uploaded_at", "preview")
@@ -464,14 +572,15 @@ class OTPAdmin(admin.ModelAdmin):
     search_fields = ("user__email", "code")
     readonly_fields = ("created_at",)
     list_filter = ("is_verified",)
+    list_select_related = ("user",)
     actions = ["mark_verified", "export_otps_csv"]
 
     def has_add_permission(self, request):
         return False
 
-    @admin.action(description=_("Mark selected OTPs as verified"))
+    @admin.action(description=_("Mark selected OTPs as verified"), permissions=["change"])
     def mark_verified(self, request, queryset):
-        updated = queryset.update(is_verified=True)
+        updated = queryset.filter(is_verified=False).update(is_verified=True)
         self.message_user(request, _("%d OTP(s) marked verified.") % updated, messages.SUCCESS)
 
     @admin.action(description=_("Export selected OTPs (CSV)"))
@@ -480,13 +589,15 @@ class OTPAdmin(admin.ModelAdmin):
             self.message_user(request, _("You do not have permission to export OTPs."), level=messages.ERROR)
             return
 
-        buffer = io.StringIO()
-        writer = csv.writer(buffer)
         field_names = ["id", "user_email", "code", "expires_at", "is_verified", "created_at"]
-        writer.writerow(field_names)
-        for otp in queryset:
-            writer.writerow([otp.id, otp.user.email, otp.code, otp.expires_at.isoformat(), otp.is_verified, otp.created_at.isoformat()])
-
-        response = HttpResponse(buffer.getvalue(), content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="otps_export.csv"'
-        return response
+        otps = (
+            queryset.select_related("user")
+            .only("id", "user__email", "code", "expires_at", "is_verified", "created_at")
+            .iterator(chunk_size=CSV_EXPORT_CHUNK_SIZE)
+        )
+        fetch = attrgetter("id", "user.email", "code", "expires_at", "is_verified", "created_at")
+        rows = (
+            (pk, email, code, expires_at.isoformat(), is_verified, created_at.isoformat())
+            for pk, email, code, expires_at, is_verified, created_at in map(fetch, otps)
+        )
+        return _stream_csv(field_names, rows, "otps_export.csv")
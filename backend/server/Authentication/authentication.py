@@ -42,19 +42,25 @@ class UUIDSessionAuthentication(SessionAuthentication):
         if isinstance(user, AnonymousUser):
             return None
 
-        # If the user object is already an instance of your User model, just check active.
-        if isinstance(user, User):
+        # If the user object is already an instance of your User model (or a wrapper
+        # around one, per its _meta), just check active.
+        if isinstance(user, User) or getattr(getattr(user, "_meta", None), "concrete_model", None) is User:
             if getattr(user, "is_active", True) is False:
                 logger.info("Inactive user attempted auth: %s", getattr(user, "pk", "<unknown>"))
                 raise AuthenticationFailed("User account is disabled.", code="user_inactive")
             return (user, auth)
 
-        # Otherwise, try to re-fetch a canonical User instance using the primary key
-        try:
-            canonical_user = User.objects.get(pk=user.pk)
-        except Exception:
-            logger.exception("Authenticated user not found in User table (pk=%s)", getattr(user, "pk", "<unknown>"))
-            raise AuthenticationFailed("Authenticated user not found.", code="user_not_found")
+        # Otherwise, re-fetch a canonical User instance using the primary key, at most
+        # once per request (cached on the underlying Django HttpRequest).
+        django_request = getattr(request, "_request", request)
+        canonical_user = getattr(django_request, "_canonical_user", None)
+        if canonical_user is None or canonical_user.pk != user.pk:
+            try:
+                canonical_user = User.objects.get(pk=user.pk)
+            except Exception:
+                logger.exception("Authenticated user not found in User table (pk=%s)", getattr(user, "pk", "<unknown>"))
+                raise AuthenticationFailed("Authenticated user not found.", code="user_not_found")
+            django_request._canonical_user = canonical_user
 
         if getattr(canonical_user, "is_active", True) is False:
             logger.info("Inactive user attempted auth: %s", getattr(canonical_user, "pk", "<unknown>"))
@@ -0,0 +1,123 @@
+import importlib
+import unittest
+
+from starlette.testclient import TestClient
+
+import main
+
+
+class ResourceApiTests(unittest.TestCase):
+    def setUp(self):
+        # the store is module state; start every test from the seed data
+        importlib.reload(main)
+        self.client = TestClient(main.app)
+
+    def upload(self, title="Linear Algebra Notes"):
+        response = self.client.post("/api/resources", data={"title": title, "tags": ["Exam Prep"]})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
+
+    def delete(self, resource_id):
+        response = self.client.delete(f"/api/resources/{resource_id}")
+        self.assertEqual(response.json()["message"], "Resource deleted")
+
+    def etag(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response.headers["etag"]
+
+    def test_matching_etag_gets_304(self):
+        for path in ("/api/resources", "/api/resources?offset=1&limit=2", "/api/trending", "/api/featured"):
+            etag = self.etag(path)
+            response = self.client.get(path, headers={"If-None-Match": etag})
+            self.assertEqual(response.status_code, 304, path)
+            self.assertEqual(response.headers["etag"], etag)
+            self.assertEqual(response.content, b"")
+
+    def test_stale_etag_gets_body(self):
+        response = self.client.get("/api/resources", headers={"If-None-Match": 'W/"stale"'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["data"]), len(main.RESOURCES))
+
+    def test_etag_changes_after_upload_and_delete(self):
+        before = self.etag("/api/resources")
+        created = self.upload()
+        after_upload = self.etag("/api/resources")
+        self.assertNotEqual(after_upload, before)
+        self.assertEqual(self.client.get("/api/resources", headers={"If-None-Match": before}).status_code, 200)
+
+        self.delete(created["id"])
+        self.assertNotEqual(self.etag("/api/resources"), after_upload)
+
+    def test_pagination(self):
+        total = len(main.RESOURCES)
+        body = self.client.get("/api/resources?offset=1&limit=2").json()
+        self.assertEqual([r["id"] for r in body["data"]], [r["id"] for r in main.RESOURCES[1:3]])
+        self.assertEqual(body["pagination"], {"offset": 1, "limit": 2, "total": total})
+
+        body = self.client.get("/api/resources?offset=-5&limit=oops").json()
+        self.assertEqual(body["pagination"], {"offset": 0, "limit": None, "total": total})
+        self.assertEqual(len(body["data"]), total)
+
+    def test_listing_reflects_upload_and_delete(self):
+        created = self.upload()
+        ids = [r["id"] for r in self.client.get("/api/resources").json()["data"]]
+        self.assertEqual(ids[-1], created["id"])
+
+        self.delete(created["id"])
+        ids = [r["id"] for r in self.client.get("/api/resources").json()["data"]]
+        self.assertNotIn(created["id"], ids)
+
+    def test_detail_not_found_after_delete(self):
+        resource_id = main.RESOURCES[0]["id"]
+        self.assertEqual(self.client.get(f"/api/resources/{resource_id}").json()["data"]["id"], resource_id)
+
+        self.delete(resource_id)
+        body = self.client.get(f"/api/resources/{resource_id}").json()
+        self.assertEqual((body["status"], body["message"]), ("error", "Resource not found"))
+        body = self.client.delete(f"/api/resources/{resource_id}").json()
+        self.assertEqual(body["message"], "Resource not found")
+
+    def test_stats_follow_upload_and_delete(self):
+        total = self.client.get("/api/stats").json()["data"]["total_resources"]
+        created = self.upload()
+        self.assertEqual(self.client.get("/api/stats").json()["data"]["total_resources"], total + 1)
+        self.delete(created["id"])
+        self.delete(main.RESOURCES[0]["id"])
+        self.assertEqual(self.client.get("/api/stats").json()["data"]["total_resources"], total - 1)
+
+    def test_suggestions_rank_prefix_matches_first(self):
+        self.upload("Applied Physics")
+        data = self.client.get("/api/search/suggestions", params={"q": "p"}).json()["data"]
+        prefix = [t for t in data if t.lower().startswith("p")]
+        # prefix matches (in title order) lead, then titles that only contain q
+        self.assertEqual(data[:len(prefix)], sorted(prefix, key=str.lower))
+        self.assertEqual(set(data[len(prefix):]), {"Data Structures PPT", "Applied Physics"})
+        self.assertEqual(len(data), len(set(data)))
+
+    def test_suggestions_include_substring_matches_alongside_prefix(self):
+        self.upload("Mathematical Methods")
+        data = self.client.get("/api/search/suggestions", params={"q": "math"}).json()["data"]
+        self.assertEqual(data, ["Mathematical Methods", "Discrete Mathematics Notes"])
+
+
+    def test_multi_method_routes_keep_their_handler_names(self):
+        names = [route.name for route in main.routes]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertEqual(main.app.url_path_for("get_resources"), "/api/resources")
+        self.assertEqual(main.app.url_path_for("get_resource", id="abc"), "/api/resources/abc")
+        self.assertEqual(main.app.url_path_for("get_user_profile"), "/api/user/profile")
+
+
+    def test_search_executor_is_shut_down_with_the_app(self):
+        with TestClient(main.app) as client:
+            executor = main._executor
+            self.assertIsNotNone(executor)
+            self.assertEqual(client.get("/api/search", params={"q": "notes"}).status_code, 200)
+        self.assertIsNone(main._executor)
+        with self.assertRaises(RuntimeError):
+            executor.submit(print)
+
+
+if __name__ == "__main__":
+    unittest.main()